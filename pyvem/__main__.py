@@ -0,0 +1,26 @@
+"""
+Lightweight program entry point. Version-only requests are answered here,
+before any of the argument parsers, commands, or ssh modules are imported.
+"""
+
+import sys
+
+from pyvem._config import _VERSION
+
+# Argument lists that only ask for the program version.
+_VERSION_ONLY_ARGS = {('-V',), ('--version',), ('version',), ('v',)}
+
+
+def main():
+    """Print the version, or hand everything else to pyvem.main"""
+    if tuple(sys.argv[1:]) in _VERSION_ONLY_ARGS:
+        print(_VERSION)
+        sys.exit(0)
+
+    # pylint: disable=import-outside-toplevel
+    from pyvem.main import main as _main
+    _main()
+
+
+if __name__ == '__main__':
+    main()
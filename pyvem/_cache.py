@@ -0,0 +1,152 @@
+"""Persist computed values on disk between program invocations"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from typing import Any, Callable
+
+from pyvem._config import _PROG
+from pyvem._containers import AttributeDict
+from pyvem._util import expanded_path
+
+_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME') or expanded_path('$HOME/.cache'), _PROG)
+
+
+def _cache_path(key: str) -> str:
+    return os.path.join(_CACHE_DIR, f'{key}.json')
+
+
+def load_cached(key: str, fingerprint: Any = None, ttl: float = None) -> Any:
+    """
+    Get a value from the on-disk cache.
+
+    Arguments:
+        key -- The name of the cached value
+
+    Keyword Arguments:
+        fingerprint -- A JSON-serializable value that must match the one the
+            value was stored with. A change in the fingerprint (e.g. a file's
+            modification time) invalidates the cached value.
+        ttl -- The number of seconds a cached value remains valid. If None,
+            the value never expires.
+
+    Returns:
+        The cached value, or None if there is no valid cached value.
+    """
+    try:
+        with open(_cache_path(key), encoding='utf-8') as cache_file:
+            entry = json.load(cache_file)
+
+        if entry['fingerprint'] != fingerprint:
+            return None
+        if ttl is not None and time.time() - entry['time'] > ttl:
+            return None
+        return entry['value']
+
+    except (EnvironmentError, ValueError, KeyError, TypeError):
+        return None
+
+
+def store_cached(key: str, value: Any, fingerprint: Any = None) -> None:
+    """
+    Write a JSON-serializable value to the on-disk cache. Failing to write
+    the cache is not an error, since the value can always be recomputed.
+
+    Arguments:
+        key -- The name of the cached value
+        value -- The value to store
+
+    Keyword Arguments:
+        fingerprint -- A JSON-serializable value to store with the value
+    """
+    entry = {'time': time.time(), 'fingerprint': fingerprint, 'value': value}
+
+    try:
+        os.makedirs(_CACHE_DIR, exist_ok=True)
+
+        # write to a temporary file first, so a concurrent reader never sees
+        # a partially-written cache file.
+        fd, temp_path = tempfile.mkstemp(dir=_CACHE_DIR, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as cache_file:
+                json.dump(entry, cache_file)
+            os.replace(temp_path, _cache_path(key))
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    except (EnvironmentError, TypeError, ValueError):
+        pass
+
+
+def disk_cached(key: str, compute: Callable[[], Any], fingerprint: Any = None,
+                ttl: float = None, refresh: bool = False) -> Any:
+    """
+    Get a value from the on-disk cache, computing and storing it if there is
+    no valid cached value. A computed value of None is never cached.
+
+    Arguments:
+        key -- The name of the cached value
+        compute -- A callable that computes the value
+
+    Keyword Arguments:
+        fingerprint -- See load_cached()
+        ttl -- See load_cached()
+        refresh -- If True, ignore any cached value
+
+    Returns:
+        The cached or computed value
+    """
+    if not refresh:
+        value = load_cached(key, fingerprint=fingerprint, ttl=ttl)
+        if value is not None:
+            return value
+
+    value = compute()
+    if value is not None:
+        store_cached(key, value, fingerprint=fingerprint)
+    return value
+
+
+def cached_run(tunnel: Any, command: str, ttl: float = 15 * 60,
+               refresh: bool = False,
+               validate: Callable[[str], bool] = None) -> Any:
+    """
+    Run a (read-only) command through the tunnel, reusing the output of an
+    identical command that succeeded on the same host within the last ttl
+    seconds (e.g. in a previous invocation of the program) instead of running
+    it again.
+
+    Arguments:
+        tunnel -- A Tunnel instance
+        command -- The command to run (e.g. a curl request)
+
+    Keyword Arguments:
+        ttl -- The number of seconds a cached output remains valid
+        refresh -- If True, always run the command (and cache its new output)
+        validate -- A function that checks whether the output of a successful
+            command may be cached. A command can exit 0 and still output an
+            error (e.g. curl saving an HTTP error response), which shouldn't
+            be replayed until the ttl runs out.
+
+    Returns:
+        The result of running the command, or a cached result having the
+        same exited, stdout, and stderr attributes.
+    """
+    fingerprint = f'{tunnel.host_id()}\n{command}'
+    digest = hashlib.blake2b(fingerprint.encode('utf-8'), digest_size=16)
+    key = f'run.{digest.hexdigest()}'
+
+    stdout = None
+    if not refresh:
+        stdout = load_cached(key, fingerprint=fingerprint, ttl=ttl)
+    if stdout is not None:
+        return AttributeDict({'exited': 0, 'stdout': stdout, 'stderr': ''})
+
+    result = tunnel.run(command)
+    if result.exited == 0 and (validate is None or validate(result.stdout)):
+        store_cached(key, result.stdout, fingerprint=fingerprint)
+    return result
@@ -2,34 +2,64 @@
 
 import logging
 import os
-import pathlib
+import threading
 
-from typing import List, Dict
+from typing import List, Dict, Set
 from configargparse import ArgumentParser, Namespace
 
 from rich.console import Console
+from rich.style import Style
 from pyvem._tunnel import Tunnel
 from pyvem._marketplace import Marketplace
+from pyvem._editor import SupportedEditor
 from pyvem._help import Help
 from pyvem._config import rich_theme
 from pyvem._logging import get_rich_logger
 
-_console = Console(theme=rich_theme)
-_LOGGER = get_rich_logger(__name__, console=_console)
+_console: Console = None
+_error_style: Style = None
+_LOGGER = get_rich_logger(__name__)
+
+
+def _get_console() -> Console:
+    """
+    Get the console used for direct (non-logging) command output, creating it
+    (and looking up the error style used with it) the first time it's needed.
+
+    Returns:
+        rich.console.Console
+    """
+    global _console, _error_style  # pylint: disable=global-statement
+
+    if _console is None:
+        _console = Console(theme=rich_theme)
+        _error_style = rich_theme.styles['error']
+    return _console
 
 
 class Command():
     """
     Abstract base command class from which all actionable commands inherit.
     """
-    tunnel: Tunnel = Tunnel()
+    tunnel: Tunnel = None
     marketplace: Marketplace = None
     main_parser: ArgumentParser = None
     main_options: Namespace = None
 
-    # Keep track of temporary files created during execution.
-    # These will be removed at the end of processing.
-    temporary_file_paths: List[str] = []
+    # Keep track of temporary files created during execution, grouped by
+    # their parent directory. These will be removed at the end of processing.
+    # Using sets collapses duplicate registrations of the same file. Each
+    # thread keeps its own registry (see _temporary_file_paths()), so that
+    # commands invoked concurrently don't clean up each other's files.
+    temporary_file_paths = threading.local()
+
+    # Whether the local output directory is known to exist. This is shared
+    # by all commands, so the directory is only checked once per process.
+    _output_dir_ensured: bool = False
+
+    # The local directories this process created. Only these are removed
+    # once their temporary files are gone, never a directory the user gave.
+    _created_local_dirs: Set[str] = set()
 
 
     def __init__(self, name: str, help: Help, aliases: List[str] = None):
@@ -50,6 +80,20 @@ class Command():
         # 'help' attribute.
         assert isinstance(self.help, Help)
 
+    @staticmethod
+    def _temporary_file_paths() -> Dict[str, Set[str]]:
+        """
+        Get the current thread's registry of temporary files, keyed by their
+        parent directory.
+
+        Returns:
+            dict
+        """
+        registry = Command.temporary_file_paths
+        if not hasattr(registry, 'paths'):
+            registry.paths = {}
+        return registry.paths
+
     @staticmethod
     def store_temporary_file_path(path: str) -> None:
         """
@@ -60,16 +104,63 @@ class Command():
             path -- The absolute path to a file.
         """
         if path:
-            Command.temporary_file_paths.append(path)
+            dirname, basename = os.path.split(path)
+            registry = Command._temporary_file_paths()
+            paths = registry.setdefault(dirname, set())
+            paths.add(basename)
 
     @staticmethod
     def remove_temporary_files() -> None:
         """
         Remove all temporary files that were created during processing.
+
+        Each parent directory is opened once and its files are unlinked
+        relative to the directory descriptor, so the directory path is only
+        resolved once per directory rather than once per file. Any parent
+        directories that this process created and that are left empty are
+        removed as well.
         """
-        if not Command.main_options.no_cleanup:
-            for tmp_file in Command.temporary_file_paths:
-                os.remove(tmp_file)
+        if Command.main_options.no_cleanup:
+            return
+
+        use_dir_fd = os.unlink in os.supports_dir_fd
+        registry = Command._temporary_file_paths()
+
+        for dirname, basenames in registry.items():
+            dir_fd = None
+
+            try:
+                if use_dir_fd:
+                    dir_fd = os.open(dirname, os.O_RDONLY | os.O_DIRECTORY)
+            except OSError as err:
+                _LOGGER.debug('%s', err)
+                continue
+
+            # Remove each file independently, so that one missing file
+            # doesn't prevent the remaining files from being removed.
+            for basename in basenames:
+                try:
+                    if dir_fd is not None:
+                        os.unlink(basename, dir_fd=dir_fd)
+                    else:
+                        os.unlink(os.path.join(dirname, basename))
+                except OSError as err:
+                    _LOGGER.debug('%s', err)
+
+            if dir_fd is not None:
+                os.close(dir_fd)
+
+            # Remove the parent directory if we created it and nothing else
+            # is left in it. A non-empty directory raises an OSError, which
+            # is ignored.
+            if dirname in Command._created_local_dirs:
+                try:
+                    os.rmdir(dirname)
+                    Command._created_local_dirs.discard(dirname)
+                except OSError:
+                    pass
+
+        registry.clear()
 
     @staticmethod
     def apply_log_level(logger: logging.Logger) -> None:
@@ -102,7 +193,7 @@ class Command():
         arguments that console.print() supports are supported here as well.
         """
         kwargs.setdefault('highlight', False)
-        _console.print(text, style=rich_theme.styles['error'], **kwargs)
+        _get_console().print(text, style=_error_style, **kwargs)
 
 
     def ensure_output_dirs_exist(self) -> bool:
@@ -140,22 +231,27 @@ class Command():
             we created it or it already existed), False if an exception was
             raised.
         """
-        # We only need to do this once.
-        if self.created_local_output_dir is not None:
+        # We only need to do this once per process, regardless of how many
+        # commands end up needing the output directory.
+        if Command._output_dir_ensured:
             return True
 
         output_dir = Command.main_options.output_dir
 
-        if os.path.exists(output_dir):
-            self.created_local_output_dir = False
-            return True
-
+        # Try to create the directory straight away rather than checking if
+        # it exists first. An existing directory just raises FileExistsError.
         try:
-            pathlib.Path(output_dir).mkdir(parents=True, exist_ok=False)
+            os.makedirs(output_dir)
             self.created_local_output_dir = True
+            Command._created_local_dirs.add(output_dir)
+            Command._output_dir_ensured = True
+            return True
+        except FileExistsError:
+            self.created_local_output_dir = False
+            Command._output_dir_ensured = True
             return True
         except EnvironmentError as err:
-            _LOGGER.debug(err)
+            _LOGGER.debug('%s', err)
             return False
 
 
@@ -177,30 +273,36 @@ class Command():
             Command.main_options = main_options
 
             # apply the log level from the original parsed arguments
-            _LOGGER.setLevel(Command.main_options.log_level)
-
-            # pass along the original remote connection args to the shared
-            # tunnel instance, so it can be ready to connect whenever a command
-            # that uses the remote connection is invoked
-            Command.tunnel.logger.setLevel(main_options.log_level)
-            Command.tunnel.apply(ssh_host=main_options.ssh_host,
-                                 ssh_gateway=main_options.ssh_gateway)
+            log_level = main_options.log_level
+            _LOGGER.setLevel(log_level)
+
+            # create the shared tunnel instance and pass along the original
+            # remote connection args, so it can be ready to connect whenever
+            # a command that uses the remote connection is invoked
+            tunnel = Tunnel(compress=main_options.ssh_compress)
+            tunnel.logger.setLevel(log_level)
+            tunnel.apply(ssh_host=main_options.ssh_host,
+                         ssh_gateway=main_options.ssh_gateway)
+            Command.tunnel = tunnel
 
             # Pass along the tunnel instance to the shared Marketplace instance
             # so we don't have to maintain multiple tunnel connections.
-            Command.marketplace = Marketplace(tunnel=Command.tunnel)
+            Command.marketplace = Marketplace(tunnel=tunnel)
+            Marketplace.refresh_cache = main_options.no_cache
+            SupportedEditor.refresh_cache = main_options.no_cache
 
         # Invoke the run() method on the called command. The run() method must
         # be implemented within each command subclass.
         try:
             self.run()
         except Exception as err:
-            _LOGGER.exception(repr(err))
+            _LOGGER.exception('%r', err)
         finally:
             # Regardless of what happens, cleanup any created remote dirs and
             # close the remote connection.
-            self.tunnel.cleanup_created_dirs()
-            self.tunnel.close()
+            tunnel = self.tunnel
+            tunnel.cleanup_created_dirs()
+            tunnel.close()
             self.remove_temporary_files()
 
 
@@ -1,13 +1,26 @@
 """General program configurations"""
 
-from fabric.util import get_local_user
+import getpass
+
 from rich.theme import Theme
 
+
+def _get_local_user():
+    """
+    Get the name of the local user (or None if it can't be determined). This
+    mirrors fabric.util.get_local_user, without importing fabric.
+    """
+    try:
+        return getpass.getuser()
+    except (KeyError, OSError):
+        return None
+
+
 _PROG = 'vem'
 _VERSION = '0.5.0-dev'
 
 _DEFAULT_SSH_PORT = 22
-_DEFAULT_SSH_USER = get_local_user()
+_DEFAULT_SSH_USER = _get_local_user()
 
 # custom 'rich' theme to use for rich output formatting.
 rich_theme = Theme({
@@ -1,6 +1,6 @@
 """Custom program container classes"""
 
-import re
+from functools import lru_cache
 
 from pyvem._config import _DEFAULT_SSH_PORT, _DEFAULT_SSH_USER
 
@@ -14,19 +14,17 @@ class AttributeDict(dict):
     __delattr__ = dict.__delitem__
 
 
-# Regex pattern to parse the components of a SSH connection string.
-CONNECTION_STRING_RE_PATTERN = re.compile(
-    r'(?:(?P<username>.*?)'
-    r'(?::(?P<password>.*?)|)@)?'
-    r'(?P<hostname>[^:\/\s]+)'
-    r'(?::(?P<port>\d+))?'
-)
+# Characters that may not appear within the hostname of a connection string.
+_INVALID_HOSTNAME_CHARS = frozenset('@:/ \t\n\r\f\v')
 
 
-def ConnectionParts(hostname, username=None, port=None, password=None):
+class ConnectionParts:
     """
-    Wrapper around an AttributeDict that allows for mutable connection
-    string components.
+    Mutable container for the components of an SSH connection string.
+
+    The set of attributes is fixed via __slots__, which keeps instances small
+    and raises an AttributeError when a misspelled attribute is accessed
+    (rather than silently returning None).
 
     Arguments:
         hostname {str} -- remote hostname
@@ -35,16 +33,60 @@ def ConnectionParts(hostname, username=None, port=None, password=None):
         username {str} -- remote username (default: {None})
         port {str|int} -- remote connection port (default: {None})
         password {str} -- remote connection password (default: {None})
+    """
+    __slots__ = ('hostname', 'username', 'port', 'password')
+
+    def __init__(self, hostname, username=None, port=None, password=None):
+        self.hostname = hostname
+        self.username = username or _DEFAULT_SSH_USER
+        self.port = port or _DEFAULT_SSH_PORT
+        self.password = password
+
+    def __repr__(self):
+        return f'{type(self).__name__}(hostname={self.hostname!r}, ' \
+               f'username={self.username!r}, port={self.port!r})'
+
+    def __eq__(self, other):
+        if not isinstance(other, ConnectionParts):
+            return NotImplemented
+        return all(getattr(self, x) == getattr(other, x)
+                   for x in self.__slots__)
+
+
+@lru_cache(maxsize=128)
+def _connection_string_groups(connection_string):
+    """
+    Parses an SSH connection string of the form [user[:password]@]host[:port]
+    into a tuple of its (username, password, hostname, port) components.
+    Results are cached, since the same connection strings tend to be parsed
+    repeatedly throughout the life of the program.
+
+    Arguments:
+        connection_string {str} -- the string to parse.
 
     Returns:
-        AttributeDict
+        tuple|None -- None if the connection string could not be parsed.
     """
-    return AttributeDict({
-        'hostname': hostname,
-        'username': username or _DEFAULT_SSH_USER,
-        'port': port or _DEFAULT_SSH_PORT,
-        'password': password,
-    })
+    # The password may itself contain '@', so split on the last one.
+    userinfo, at_sign, hostport = connection_string.rpartition('@')
+    hostname, colon, port = hostport.partition(':')
+
+    if not hostname or not _INVALID_HOSTNAME_CHARS.isdisjoint(hostname):
+        return None
+
+    if colon:
+        if not port.isdigit():
+            return None
+        port = int(port)
+    else:
+        port = None
+
+    username, password = None, None
+    if at_sign:
+        username, colon, password = userinfo.partition(':')
+        password = password if colon else None
+
+    return username, password, hostname, port
 
 
 def parsed_connection_parts(connection_string):
@@ -58,16 +100,12 @@ def parsed_connection_parts(connection_string):
         connection_string {str} -- the string to parse.
 
     Returns:
-        AttributeDict
+        ConnectionParts
     """
-    try:
-        username, password, hostname, port = \
-            CONNECTION_STRING_RE_PATTERN.match(connection_string).groups()
-        return ConnectionParts(
-            hostname=hostname,
-            username=username or _DEFAULT_SSH_USER,
-            port=port or _DEFAULT_SSH_PORT,
-            password=password,
-        )
-    except AttributeError:
+    groups = _connection_string_groups(connection_string)
+    if groups is None:
         return None
+
+    username, password, hostname, port = groups
+    return ConnectionParts(hostname=hostname, username=username, port=port,
+                           password=password)
@@ -3,60 +3,75 @@
 import json
 from shlex import quote
 
-from requests import Request
+from requests import Request, Session
+
+# orjson is an optional (and much faster) drop-in for encoding request bodies.
+try:
+    from orjson import dumps as _orjson_dumps
+except ImportError:
+    _orjson_dumps = None
+
+# Options added to every curl command. Transfers hide the progress meter (so
+# stderr only holds actual errors), and connections are kept alive and sent
+# without Nagle delays, so a command that fetches several urls can reuse its
+# connection to the same host. Each of these options is available in curl
+# releases as old as 7.29 (e.g. CentOS 7).
+_CURL_OPTIONS = ' -sS --keepalive-time 30 --tcp-nodelay'
 
 
 class CurledRequest():
+    def __init__(self):
+        # Reuse a single session to prepare every request. The session's
+        # default headers and environment lookups (e.g. .netrc auth) are
+        # disabled so that the generated curl commands only contain what
+        # the caller asked for.
+        self._session = Session()
+        self._session.headers.clear()
+        self._session.trust_env = False
+
+
     def _convert_to_curl_command(
             self,
             request,
             compressed=True,
             verify=True,
             allow_redirects=True,
-            output=None
+            output=None,
+            write_out=None,
+            include_headers=False,
+            fail=False
     ):
-        # maintain a list of request parts, which are tuples comprised of the
-        # "option identifier" and "value" of a given part of the request.
-        parts = [('curl', None), ('-X', request.method)]
-
-        # add all the request headers to the list of request parts.
-        for k, v in sorted(request.headers.items()):
-            parts += [('-H', '{0}: {1}'.format(k, v))]
+        # quote each optional part of the command up front (including its
+        # leading space), so the whole command can be composed in a single
+        # string template.
+        headers = ''.join(f' -H {quote(f"{k}: {v}")}'
+                          for k, v in request.headers.items())
 
-        # add all of the elements from the request body to the list of parts.
+        body = ''
         if request.body:
             body = request.body
             if isinstance(body, bytes):
                 body = body.decode('utf-8')
-            parts += [('-d', body)]
+            body = f' -d {quote(body)}'
 
-        # conditionally add additional arguments to the request parts.
+        flags = _CURL_OPTIONS
         if compressed:
-            parts += [('--compressed', None)]
-
+            flags += ' --compressed'
         if not verify:
-            parts += [('--insecure', None)]
-
+            flags += ' --insecure'
         if allow_redirects:
-            parts += [('-L', None)]
-
-        # Add the url to the request parts
-        parts += [(None, request.url)]
-
-        # Add an output location, if specified
-        if output:
-            parts += [('-o', output)]
+            flags += ' -L'
+        if write_out:
+            flags += f' -w {quote(write_out)}'
+        if include_headers:
+            flags += ' -i'
+        if fail:
+            flags += ' -f'
 
-        # flatten the parts (of tuples) into a 1d list
-        flat_parts = []
-        for k, v in parts:
-            if k:
-                flat_parts.append(quote(k))
-            if v:
-                flat_parts.append(quote(v))
+        output = f' -o {quote(output)}' if output else ''
 
-        # join the flattened parts into a string
-        return ' '.join(flat_parts)
+        return f'curl -X {quote(request.method)}{headers}{body}{flags} ' \
+               f'{quote(request.url)}{output}'
 
 
     def request(self, method, url, **kwargs):
@@ -66,19 +81,26 @@ class CurledRequest():
         compressed = kwargs.pop('compressed', True)
         output = kwargs.pop('output', None)
         output_dir = kwargs.pop('output_dir', None)
+        write_out = kwargs.pop('write_out', None)
+        include_headers = kwargs.pop('include_headers', False)
+        fail = kwargs.pop('fail', False)
 
         if output_dir and not output:
             output = f'{output_dir}/{url.split("/")[-1]}'
 
         # Make the prepared request
-        prepared_request = Request(method, url, **kwargs).prepare()
+        prepared_request = self._session.prepare_request(
+            Request(method, url, **kwargs))
 
         # Convert the prepared request to its cURL equivalent
         curled_request = self._convert_to_curl_command(
             prepared_request,
             allow_redirects=allow_redirects,
             compressed=compressed,
-            output=output
+            output=output,
+            write_out=write_out,
+            include_headers=include_headers,
+            fail=fail
         )
 
         return curled_request
@@ -89,6 +111,39 @@ class CurledRequest():
         return self.request('GET', url, params=params, **kwargs)
 
 
+    def get_many(self, urls, separator, **kwargs):
+        """
+        Build a single curl command that fetches several urls, so curl can
+        reuse its connection to any host that is requested more than once.
+        The responses are written to stdout one after the other, each one
+        followed by the separator.
+        """
+        kwargs.setdefault('allow_redirects', True)
+        first_url, *other_urls = urls
+        command = self.request('GET', first_url, write_out=separator, **kwargs)
+        return ' '.join([command] + [quote(url) for url in other_urls])
+
+
+    def get_files(self, downloads, **kwargs):
+        """
+        Build a single curl command that downloads several urls to their
+        own output files, so curl can reuse its connection to any host that
+        is requested more than once.
+
+        Arguments:
+            downloads -- A list of (url, output path) tuples
+
+        Keyword Arguments:
+            See request(). Options such as fail and write_out apply to each
+            one of the downloads.
+        """
+        kwargs.setdefault('allow_redirects', True)
+        (first_url, first_output), *other_downloads = downloads
+        command = self.request('GET', first_url, output=first_output, **kwargs)
+        return command + ''.join(f' {quote(url)} -o {quote(output)}'
+                                 for url, output in other_downloads)
+
+
     def head(self, url, params=None, **kwargs):
         kwargs.setdefault('allow_redirects', False)
         return self.request('HEAD', url, params=params, **kwargs)
@@ -99,6 +154,22 @@ class CurledRequest():
         return self.request('HEAD', url, params=params, **kwargs)
 
 
-    def post(self, url, data={}, headers={}, **kwargs):
+    def post(self, url, data=None, headers=None, **kwargs):
         kwargs.setdefault('compressed', True)
-        return self.request('POST', url, data=json.dumps(data), headers=headers, **kwargs)
+
+        # Serialize the data unless the caller already did, omitting the
+        # optional whitespace between JSON items to keep the body small.
+        if data is not None and not isinstance(data, (str, bytes)):
+            data = _json_dumps(data)
+
+        return self.request('POST', url, data=data, headers=headers, **kwargs)
+
+
+def _json_dumps(data):
+    """
+    Serialize data to compact JSON, using orjson if it's available. orjson
+    produces (UTF-8 encoded) bytes, which the request body accepts as-is.
+    """
+    if _orjson_dumps is not None:
+        return _orjson_dumps(data)
+    return json.dumps(data, separators=(',', ':'))
@@ -1,48 +1,109 @@
 """Code editor management module"""
 
-from distutils.spawn import find_executable
-import json
 import os
 import re
+import shutil
 import subprocess
-from typing import List, Any
+import sys
+from functools import lru_cache
+from typing import TYPE_CHECKING, List, Any
 
 from cached_property import cached_property
 
+# orjson is an optional (and much faster) drop-in for decoding JSON responses.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+from pyvem._cache import disk_cached, load_cached, store_cached
 from pyvem._util import expanded_path
 from pyvem._containers import AttributeDict
 from pyvem._machine import platform_query
-from pyvem._curler import CurledRequest
 from pyvem._logging import get_rich_logger
-from pyvem._tunnel import Tunnel
+
+# The tunnel is only needed for annotations here, so don't pay for importing
+# the ssh libraries until something else actually needs them.
+if TYPE_CHECKING:
+    from pyvem._tunnel import Tunnel
 
 
 _ENCODING = 'utf-8'
+
+# Matches each line of the editor's --list-extensions --show-versions output.
+# Each part is a negated character class, so matching never backtracks.
 _EXTENSION_ATTRIBUTES_RE = re.compile(
-    r'^(?P<unique_id>.*?^'
-    r'(?P<publisher>.*?)\.'
-    r'(?P<package>.*))\@(?P<version>.*)'
+    r'^(?P<publisher>[^.@\s]+)\.(?P<package>[^@\s]+)@(?P<version>\S+)',
+    re.ASCII | re.MULTILINE
+)
+_find_extension_attributes = _EXTENSION_ATTRIBUTES_RE.finditer
+
+# Matches the name of an extension's directory within the editor's extensions
+# directory, e.g. "ms-vscode.cpptools-1.0.1" or "ms-vscode.cpptools-1.0.1-linux"
+_EXTENSION_DIRNAME_RE = re.compile(
+    r'(?P<publisher>[^.]+)\.(?P<package>.+?)-(?P<version>\d+\.\d+\.\d+[^-]*)',
+    re.ASCII
 )
+_match_extension_dirname = _EXTENSION_DIRNAME_RE.match
 
 _GITHUB_EDITOR_UPDATE_ROOT_URL = 'https://api.github.com'
 _MARKETPLACE_EDITOR_UPDATE_ROOT_URL = 'https://update.code.visualstudio.com/api/update'
 
-# These represent the query patterns for the different vscode editors based
-# on the system platform and architecture.
-_MARKETPLACE_EDITOR_DISTRO_PATTERN = platform_query(
-    windows='win32-x64',
-    win32='win32',
-    darwin='darwin',
-    linux='linux-x64',
-    linux32='linux-ia32',
-    rpm='linux-rpm-64',
-    rpm32='linux-rpm-ia32',
-    deb='linux-deb-x64',
-    deb32='linux-deb-ia32'
-)
+
+@lru_cache(maxsize=None)
+def _marketplace_editor_distro_pattern() -> str:
+    """
+    Get the query pattern for the vscode editor downloads based on the system
+    platform and architecture. The machine is only inspected on first use.
+    """
+    return platform_query(
+        windows='win32-x64',
+        win32='win32',
+        darwin='darwin',
+        linux='linux-x64',
+        linux32='linux-ia32',
+        rpm='linux-rpm-64',
+        rpm32='linux-rpm-ia32',
+        deb='linux-deb-x64',
+        deb32='linux-deb-ia32'
+    )
+
+
+# The file extension of the VSCodium release asset by platform (see
+# platform_query()). The platform is only queried once a download url is
+# actually needed.
+_CODIUM_GITHUB_EXT_PATTERNS = {
+    'darwin': 'dmg',
+    'windows': 'exe',
+    'linux': 'AppImage',
+    'rpm': 'rpm',
+    'deb': 'deb',
+}
+
+# How long (in seconds) a fetched editor release is cached on disk.
+_LATEST_CACHE_TTL = 60 * 60
+
+# Separates the responses when several editor releases are fetched at once.
+_LATEST_RESPONSE_SEPARATOR = '\n--pyvem-latest-response--\n'
 
 _LOGGER = get_rich_logger(__name__)
-_curled = CurledRequest()
+_curled = None
+
+
+def _get_curled():
+    """
+    Get the CurledRequest used to build the editors' curl commands, creating
+    it (and importing requests) the first time it's needed.
+
+    Returns:
+        CurledRequest
+    """
+    global _curled  # pylint: disable=global-statement
+
+    if _curled is None:
+        from pyvem._curler import CurledRequest
+        _curled = CurledRequest()
+    return _curled
 
 
 SupportedEditorCommands = AttributeDict({
@@ -52,11 +113,27 @@ SupportedEditorCommands = AttributeDict({
     'codium': 'codium',
 })
 
+# Intern the editor commands, since they're compared and hashed repeatedly
+# (e.g. when fuzzy-matching editor names and caching PATH lookups).
+for _key, _command in SupportedEditorCommands.items():
+    SupportedEditorCommands[_key] = sys.intern(_command)
+del _key, _command
 
-class SupportedEditor(AttributeDict):
+
+class SupportedEditor:
     """
     Define the attributes of a supported code editor.
+
+    The constructor attributes are stored in __slots__. The instance __dict__
+    is kept only to hold the values of the cached properties.
     """
+    __slots__ = ('command', 'editor_id', 'remote_alias', 'home_dirname',
+                 'api_root_url', 'github_ext_patterns', 'tunnel', '__dict__')
+
+    # If True, values cached on disk by earlier runs are not reused (e.g. when
+    # the --no-cache option is given). Fresh values are still cached.
+    refresh_cache = False
+
     def __init__(
             self,
             command,
@@ -65,17 +142,22 @@ class SupportedEditor(AttributeDict):
             home_dirname,
             tunnel,
             api_root_url=_MARKETPLACE_EDITOR_UPDATE_ROOT_URL,
-            github_ext_pattern=None,
+            github_ext_patterns=None,
     ):
         self.command = command
         self.editor_id = editor_id
         self.remote_alias = remote_alias
         self.home_dirname = home_dirname
         self.api_root_url = api_root_url
-        self.github_ext_pattern = github_ext_pattern
+        self.github_ext_patterns = github_ext_patterns
         self.tunnel = tunnel
 
 
+    def __repr__(self):
+        return f'{type(self).__name__}(command={self.command!r}, ' \
+               f'editor_id={self.editor_id!r})'
+
+
     def install_extension(self, extension_path):
         """
         Install an extension from a specified file path
@@ -89,16 +171,57 @@ class SupportedEditor(AttributeDict):
             ext_name = os.path.basename(extension_path)
             _LOGGER.info('Installing %s', ext_name)
 
-            subprocess.Popen([self.command, '--install-extension',
-                              extension_path],
-                              stdout=subprocess.PIPE,
-                              stderr=subprocess.PIPE).wait()
+            # Only stderr is read, so stdout is discarded rather than piped
+            # (an unread pipe can fill up and block the editor process).
+            subprocess.run([self.command, '--install-extension',
+                            extension_path],
+                           stdout=subprocess.DEVNULL,
+                           stderr=subprocess.PIPE,
+                           check=False)
 
         except Exception as err:
-            _LOGGER.error('Failed to install extension: %d', ext_name)
+            _LOGGER.error('Failed to install extension: %s', ext_name)
             _LOGGER.debug(repr(err))
 
 
+    def install_extensions(self, extension_paths: List[str]) -> bool:
+        """
+        Install several extensions from their file paths with a single
+        invocation of the editor's CLI, so the (relatively slow) editor
+        startup is only paid once, rather than once per extension.
+
+        Arguments:
+            extension_paths -- file system paths of the extensions to install
+
+        Returns:
+            bool -- True if the editor reported a successful installation
+        """
+        if not extension_paths:
+            return True
+
+        command = [self.command]
+        for extension_path in extension_paths:
+            _LOGGER.info('Installing %s', os.path.basename(extension_path))
+            command += ['--install-extension', extension_path]
+
+        try:
+            result = subprocess.run(command,
+                                    stdout=subprocess.DEVNULL,
+                                    stderr=subprocess.PIPE,
+                                    encoding=_ENCODING,
+                                    check=False)
+        except EnvironmentError as err:
+            _LOGGER.error('Failed to install extensions to %s', self.editor_id)
+            _LOGGER.debug(repr(err))
+            return False
+
+        if result.returncode != 0:
+            _LOGGER.error('Failed to install extensions to %s', self.editor_id)
+            _LOGGER.debug(result.stderr)
+            return False
+        return True
+
+
     def get_extensions(self, force_recheck: bool = False) -> List[Any]:
         """
         Builds a list of extensions for the current code editor, parsing each
@@ -122,13 +245,43 @@ class SupportedEditor(AttributeDict):
         if not self.installed:
             return []
 
-        # if a forced recheck is requested, deleted the current extensions cache
-        # before rebuilding the extensions list
+        # if a forced recheck is requested, ignore the current extensions cache
+        # and rebuild the extensions list
         if force_recheck:
-            del self.__dict__['extensions']
+            self.__dict__['extensions'] = self._cached_on_disk(
+                'extensions', self._list_extensions,
+                fingerprint=_modified_time(self.extensions_dir), refresh=True)
         return self.extensions
 
 
+    def prefetch(self):
+        """
+        Resolve the (cached) attributes of this editor that are determined by
+        running the editor itself, so they're ready before they're needed.
+        """
+        if self.installed:
+            _ = self.engine, self.extensions
+
+
+    def _cache_key(self, name):
+        """Get the on-disk cache key of one of this editor's attributes."""
+        return f'{self.command}.{name}'
+
+
+    def _cached_on_disk(self, name, compute, **kwargs):
+        """
+        Get an attribute of this editor from the on-disk cache (computing
+        and caching it if needed), so it can be reused by later invocations
+        of the program. See pyvem._cache.disk_cached for the kwargs.
+
+        Arguments:
+            name -- The name of the attribute
+            compute -- A callable that computes the attribute
+        """
+        kwargs['refresh'] = kwargs.get('refresh') or self.refresh_cache
+        return disk_cached(self._cache_key(name), compute, **kwargs)
+
+
     def download(self, remote_dir: str, local_dir: str) -> str:
         """
         Communicate to the tunnel instance to download the editor on the remote
@@ -144,7 +297,7 @@ class SupportedEditor(AttributeDict):
         """
         remote_fs_path = os.path.join(remote_dir, self.download_file_name)
         local_fs_path = os.path.join(local_dir, self.download_file_name)
-        curl_request = _curled.get(self.download_url, output=remote_fs_path)
+        curl_request = _get_curled().get(self.download_url, output=remote_fs_path)
 
         response = self.tunnel.run(curl_request)
         if response.exited != 0:
@@ -169,6 +322,19 @@ class SupportedEditor(AttributeDict):
             str|None -- The engine version of the editor (or None if the editor
             is not installed or not on the PATH).
         """
+        # The cached version is invalidated whenever the editor executable
+        # is replaced (e.g. when the editor is updated).
+        executable = _which(self.command)
+        if executable is None:
+            return None
+
+        return self._cached_on_disk(
+            'engine', self._get_engine,
+            fingerprint=_modified_time(os.path.realpath(executable)))
+
+
+    def _get_engine(self):
+        """Run the editor to get its currently-installed version."""
         try:
             # check the installed editor version. This will return 3 lines:
             # 1) the installed editor engine version
@@ -194,15 +360,131 @@ class SupportedEditor(AttributeDict):
         Returns:
             list
         """
-        stdout, _ = subprocess.Popen([self.command, '--list-extensions',
-                                      '--show-versions'],
-                                     stdout=subprocess.PIPE,
-                                     stderr=subprocess.PIPE,
-                                     encoding='utf-8').communicate()
+        # The cached list is invalidated whenever an extension is added to or
+        # removed from the editor's extensions directory.
+        return self._cached_on_disk(
+            'extensions', self._list_extensions,
+            fingerprint=_modified_time(self.extensions_dir))
+
+
+    def _list_extensions(self):
+        """
+        List the installed extensions from the editor's extensions manifest,
+        or from the extension directories themselves if there's no usable
+        manifest. The editor is only run if neither of those can be read.
+        """
+        extensions = self._read_extensions_manifest()
+        if extensions is None:
+            extensions = self._scan_extensions_dir()
+        if extensions is None:
+            extensions = self._run_list_extensions()
+        return extensions
+
+
+    def _read_obsolete_extensions(self):
+        """
+        Removed extensions may linger on disk until the editor restarts. Their
+        directory names are listed in the .obsolete file.
+
+        Returns:
+            dict -- The obsolete extension directory names
+        """
+        try:
+            with open(os.path.join(self.extensions_dir, '.obsolete'),
+                      'rb') as obsolete_file:
+                return _json_loads(obsolete_file.read())
+        except (EnvironmentError, ValueError):
+            return {}
+
+
+    def _read_extensions_manifest(self):
+        """
+        Read the installed extensions from the extensions.json manifest that
+        the editor maintains in its extensions directory. This avoids starting
+        the editor (which takes a second or more) just to list extensions.
+
+        Returns:
+            list|None -- A list of extension dicts (in the same format as
+            get_extensions()) or None if the manifest can't be read.
+        """
+        try:
+            with open(os.path.join(self.extensions_dir, 'extensions.json'),
+                      'rb') as manifest_file:
+                manifest = _json_loads(manifest_file.read())
+        except (EnvironmentError, ValueError):
+            return None
+
+        obsolete = self._read_obsolete_extensions()
+        extensions = []
+        try:
+            for entry in manifest:
+                if entry.get('relativeLocation') in obsolete:
+                    continue
+                unique_id = entry['identifier']['id']
+                publisher, _, package = unique_id.partition('.')
+                extensions.append({
+                    'unique_id': unique_id,
+                    'publisher': publisher,
+                    'package': package,
+                    'version': entry['version'],
+                })
+        except (AttributeError, KeyError, TypeError):
+            return None
+        return extensions
+
+
+    def _scan_extensions_dir(self):
+        """
+        List the installed extensions by parsing the names of the extension
+        directories in the editor's extensions directory.
+
+        Returns:
+            list|None -- A list of extension dicts (in the same format as
+            get_extensions()) or None if the directory can't be read.
+        """
+        obsolete = self._read_obsolete_extensions()
+        extensions = []
+
+        try:
+            with os.scandir(self.extensions_dir) as entries:
+                for entry in entries:
+                    if entry.name in obsolete or not entry.is_dir():
+                        continue
+                    match = _match_extension_dirname(entry.name)
+                    if match is None:
+                        continue
+                    publisher, package, version = match.groups()
+                    extensions.append({
+                        'unique_id': f'{publisher}.{package}',
+                        'publisher': publisher,
+                        'package': package,
+                        'version': version,
+                    })
+        except EnvironmentError:
+            return None
+        return extensions
+
+
+    def _run_list_extensions(self):
+        """Run the editor to list its installed extensions."""
+        stdout = subprocess.run([self.command, '--list-extensions',
+                                 '--show-versions'],
+                                stdout=subprocess.PIPE,
+                                stderr=subprocess.DEVNULL,
+                                encoding=_ENCODING,
+                                check=False).stdout
 
         # parse the results into a list of dicts of extension attributes
-        return [_EXTENSION_ATTRIBUTES_RE.match(line).groupdict()
-                for line in stdout.splitlines()]
+        extensions = []
+        for match in _find_extension_attributes(stdout):
+            publisher, package, version = match.groups()
+            extensions.append({
+                'unique_id': f'{publisher}.{package}',
+                'publisher': publisher,
+                'package': package,
+                'version': version,
+            })
+        return extensions
 
 
     @cached_property
@@ -213,7 +495,8 @@ class SupportedEditor(AttributeDict):
         if self.api_root_url.startswith(_GITHUB_EDITOR_UPDATE_ROOT_URL):
             return self.api_root_url
 
-        path = f'/{_MARKETPLACE_EDITOR_DISTRO_PATTERN}/{self.remote_alias}/latest'
+        distro = _marketplace_editor_distro_pattern()
+        path = f'/{distro}/{self.remote_alias}/latest'
         return f'{self.api_root_url}{path}'
 
 
@@ -232,25 +515,66 @@ class SupportedEditor(AttributeDict):
             sha256hash: <str>,
         }
         """
-        curl_request = _curled.get(self.api_url)
+        return self._cached_on_disk('latest', self._fetch_latest,
+                                    fingerprint=self.api_url,
+                                    ttl=_LATEST_CACHE_TTL)
+
+
+    def _fetch_latest(self):
+        """Fetch the latest release of the editor through the tunnel."""
+        curl_request = _get_curled().get(self.api_url)
         response = self.tunnel.run(curl_request, hide=True)
 
         if response.exited == 0:
-            return json.loads(response.stdout)
+            return self._parse_latest(response.stdout)
 
         _LOGGER.error(response.stderr)
         return None
 
 
+    def _parse_latest(self, body):
+        """
+        Parse a fetched release of the editor. An API error (e.g. a rate limit
+        message) is logged and None is returned instead, so it's never cached.
+
+        Arguments:
+            body -- The response body of a request to the api_url
+
+        Returns:
+            The release dict, or None if the body isn't a release.
+        """
+        try:
+            release = _json_loads(body)
+        except ValueError as err:
+            _LOGGER.error('%s: %r', self.editor_id, err)
+            return None
+
+        if self.api_url.startswith(_GITHUB_EDITOR_UPDATE_ROOT_URL):
+            required = ('tag_name', 'assets')
+        else:
+            required = ('url', 'name')
+
+        if isinstance(release, dict) and all(x in release for x in required):
+            return release
+
+        message = release.get('message') if isinstance(release, dict) else None
+        _LOGGER.error('%s: the latest release could not be fetched: %s',
+                      self.editor_id, message or body[:200])
+        return None
+
+
     @cached_property
     def download_url(self):
         """Get the URL where the latest editor release can be downloaded"""
+        if self.latest is None:
+            return None
+
         # if this editor uses the github api, we need to determine which asset
         # we're looking for and find the browser download url
         if self.api_url.startswith(_GITHUB_EDITOR_UPDATE_ROOT_URL):
+            pattern = self.github_ext_pattern
             assets = self.latest['assets']
-            asset = next(x for x in assets
-                         if x['name'].endswith(self.github_ext_pattern))
+            asset = next(x for x in assets if x['name'].endswith(pattern))
             return asset['browser_download_url']
 
         # if this editor uses the the visualstudio update api, get the url from
@@ -259,13 +583,24 @@ class SupportedEditor(AttributeDict):
             return self.latest['url']
 
 
-    @property
+    @cached_property
+    def github_ext_pattern(self):
+        """
+        Get the file extension of the editor's GitHub release asset for the
+        current platform (or None if the editor isn't released on GitHub).
+        """
+        if not self.github_ext_patterns:
+            return None
+        return platform_query(**self.github_ext_patterns)
+
+
+    @cached_property
     def download_file_name(self):
         """Get the name of the editor download file"""
         return os.path.basename(self.download_url)
 
 
-    @property
+    @cached_property
     def extensions_dir(self):
         """Get the full path to the editor extensions directory"""
         return expanded_path(f'$HOME/{self.home_dirname}/extensions')
@@ -274,16 +609,16 @@ class SupportedEditor(AttributeDict):
     @property
     def installed(self):
         """Check if the editor is installed on the current machine"""
-        return find_executable(self.command) is not None
+        return _which(self.command) is not None
 
 
-    @property
+    @cached_property
     def latest_version(self):
         """Get the version of the latest editor release"""
-        return self.latest.get('name')
+        return self.latest.get('name') if self.latest else None
 
 
-    @property
+    @cached_property
     def can_update(self):
         """Check if the editor can be updated"""
         installed_version = self.engine
@@ -298,6 +633,44 @@ class SupportedEditor(AttributeDict):
             installed_version is None or installed_version != latest_version)
 
 
+def prefetch_editors(*editors, remote: bool = True):
+    """
+    Resolve the attributes of several editors concurrently, rather than one
+    editor at a time. Each editor's local attributes are resolved in its own
+    thread, since most of that time is spent waiting on the editor process.
+
+    Arguments:
+        editors {SupportedEditor} -- The editors to prefetch
+
+    Keyword Arguments:
+        remote {bool} -- If True, also fetch the latest releases of the
+            editors through the tunnel (default: {True})
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=len(editors) + 1) as executor:
+        futures = [executor.submit(x.prefetch) for x in editors]
+        if remote:
+            futures.append(executor.submit(prefetch_latest, *editors))
+
+        for future in futures:
+            future.result()
+
+
+@lru_cache(maxsize=8)
+def _which(command):
+    """Find the path to an executable on the PATH (or None if not found)."""
+    return shutil.which(command)
+
+
+def _modified_time(path):
+    """Get the modification time of a path (or None if it doesn't exist)."""
+    try:
+        return os.path.getmtime(path)
+    except EnvironmentError:
+        return None
+
+
 def set_tunnel_for_editors(tunnel, *editors):
     """
     Apply a tunnel object for all provided SupportedEditor instances.
@@ -307,11 +680,53 @@ def set_tunnel_for_editors(tunnel, *editors):
 
     """
     for editor in editors:
-        assert isinstance(editor, SupportedEditor)
-        setattr(editor, 'tunnel', tunnel)
+        editor.tunnel = tunnel
 
 
-def get_editors(tunnel: Tunnel = None):
+def prefetch_latest(*editors):
+    """
+    Fetch the latest releases of several editors with a single remote curl
+    command (rather than one command per editor), and cache the results as
+    each editor's "latest" attribute.
+
+    Arguments:
+        editors {SupportedEditor} -- The editors to fetch the releases of
+    """
+    editors = [x for x in editors if 'latest' not in x.__dict__]
+
+    # use any releases that are still cached on disk
+    if not SupportedEditor.refresh_cache:
+        for editor in editors:
+            cached = load_cached(editor._cache_key('latest'),
+                                 fingerprint=editor.api_url,
+                                 ttl=_LATEST_CACHE_TTL)
+            if cached is not None:
+                editor.__dict__['latest'] = cached
+
+    editors = [x for x in editors if 'latest' not in x.__dict__]
+    if not editors:
+        return
+
+    tunnel = editors[0].tunnel
+    curl_request = _get_curled().get_many([x.api_url for x in editors],
+                                          _LATEST_RESPONSE_SEPARATOR)
+    response = tunnel.run(curl_request, hide=True)
+
+    if response.exited != 0:
+        # leave the editors to fetch their own releases
+        _LOGGER.debug(response.stderr)
+        return
+
+    bodies = response.stdout.split(_LATEST_RESPONSE_SEPARATOR)
+    for editor, body in zip(editors, bodies):
+        release = editor._parse_latest(body)
+        editor.__dict__['latest'] = release
+        if release is not None:
+            store_cached(editor._cache_key('latest'), release,
+                         fingerprint=editor.api_url)
+
+
+def get_editors(tunnel: 'Tunnel' = None):
     """
     Get AttributeDict of SupportedEditors.
 
@@ -355,12 +770,6 @@ def get_editors(tunnel: Tunnel = None):
             remote_alias='codium',
             tunnel=tunnel,
             api_root_url='https://api.github.com/repos/VSCodium/vscodium/releases/latest',
-            github_ext_pattern=platform_query(
-                darwin='dmg',
-                windows='exe',
-                linux='AppImage',
-                rpm='rpm',
-                deb='deb'
-            )
+            github_ext_patterns=_CODIUM_GITHUB_EXT_PATTERNS,
         )
     })
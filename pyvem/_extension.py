@@ -1,20 +1,42 @@
 """Module for representing an individual Extension"""
 
-import json
+import logging
 import os
-from typing import Any, List
-
+import posixpath
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain
+from typing import Any, Dict, List, Set, Tuple
+
+# orjson is an optional (and much faster) drop-in for decoding JSON responses.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+from pyvem._cache import load_cached, store_cached
 from pyvem._util import dict_from_list_key
 from pyvem._containers import AttributeDict
 from pyvem._machine import platform_query
-from pyvem._marketplace import Marketplace
-from pyvem._curler import CurledRequest
+from pyvem._marketplace import (
+    Marketplace,
+    _MAX_QUERY_WORKERS,
+    _REQUEST_CURLER
+)
 from pyvem._logging import get_rich_logger
 from pyvem._tunnel import Tunnel
 
 _GITHUB_API_ROOT_URI = 'https://api.github.com'
 _GITHUB_ROOT_URI = 'https://github.com'
 
+# Separates the headers from the body of an HTTP response.
+_HTTP_HEAD_END_RE = re.compile(r'\r?\n\r?\n')
+
+# Written out by curl after each download, so the result of every download in
+# a batch can be told apart (curl's exit status only reflects the last one).
+_DOWNLOAD_STATUS_FORMAT = '%{http_code} %{filename_effective}\n'
+
 # NOTE: Active issue for better handling offline binaries installation
 # https://github.com/microsoft/vscode-cpptools/issues/5290
 
@@ -22,21 +44,23 @@ _GITHUB_ROOT_URI = 'https://github.com'
 # - platform-specified vsix extensions
 # - check dependencies via the install.lock file (https://github.com/microsoft/vscode-cpptools/issues/4778#issuecomment-568125545)
 
-_NON_MARKETPLACE_EXTENSIONS = AttributeDict({
-    'ms-vscode.cpptools': AttributeDict({
+# The extensions that aren't downloaded from the marketplace, with the asset
+# name of each one by platform (see platform_query()). The platform is only
+# queried once one of these extensions is actually requested.
+_NON_MARKETPLACE_EXTENSIONS = {
+    'ms-vscode.cpptools': {
         'owner': 'Microsoft',
         'repo': 'vscode-cpptools',
-        'asset_name': platform_query(
-            windows='cpptools-win32.vsix',
-            darwin='cpptools-osx.vsix',
-            linux64='cpptools-linux.vsix',
-            linux32='cpptools-linux32.vsix'
-        )
-    })
-})
+        'asset_names': {
+            'windows': 'cpptools-win32.vsix',
+            'darwin': 'cpptools-osx.vsix',
+            'linux64': 'cpptools-linux.vsix',
+            'linux32': 'cpptools-linux32.vsix',
+        },
+    },
+}
 
 _LOGGER = get_rich_logger(__name__)
-_REQUEST_CURLER = CurledRequest()
 
 
 class Extension:
@@ -47,96 +71,159 @@ class Extension:
         self.unique_id = kwargs.get('unique_id')
         self.download_url = kwargs.get('download_url')
         self.should_download_from_marketplace = \
-            self.unique_id not in _NON_MARKETPLACE_EXTENSIONS.keys()
+            self.unique_id not in _NON_MARKETPLACE_EXTENSIONS
+
+        self.extension_dependencies = kwargs.get('extension_dependencies', [])
+        self.extension_pack = kwargs.get('extension_pack', [])
+        self.version = kwargs.get('version')
+
+        # The name of the .vsix file this extension is downloaded to. If a
+        # specific version of the extension is known, the version is included
+        # in the name (for added specificity). .vsix is universal to all
+        # VSCode extensions.
+        version_suffix = f'-{self.version}' if self.version else ''
+        self.download_file_name = f'{self.unique_id}{version_suffix}.vsix'
+
+
+    def collect_unique(self, seen: set) -> List['Extension']:
+        """
+        Flatten this extension, its dependencies, and its extension pack items
+        (recursively) into a list that contains each extension only once. The
+        same extension may be required more than once (e.g. by two extensions
+        in the same pack), but only needs to be downloaded once.
+
+        Arguments:
+            seen -- The unique ids of the extensions that were already
+                collected. Any extension in this set is skipped, and each
+                collected extension is added to it.
+
+        Returns:
+            A list of Extension instances, with the dependencies and extension
+            pack items of each extension ahead of the extension.
+        """
+        if self.unique_id in seen:
+            return []
+
+        # Mark the extension before visiting its children, so an extension
+        # that (indirectly) requires itself doesn't recurse forever.
+        seen.add(self.unique_id)
+        nodes = []
+
+        # Check for extension dependencies and extension pack items.
+        if _LOGGER.isEnabledFor(logging.INFO):
+            num_dependencies = len(self.extension_dependencies)
+            num_extension_pack = len(self.extension_pack)
+
+            if num_dependencies > 0:
+                _LOGGER.info('%s has %d extension dependencies.',
+                             self.unique_id, num_dependencies)
+
+            if num_extension_pack > 0:
+                _LOGGER.info('%s has %s extensions in extension pack.',
+                             self.unique_id, num_extension_pack)
+
+        for extension in chain(self.extension_dependencies,
+                               self.extension_pack):
+            nodes.extend(extension.collect_unique(seen))
 
-        self.extension_dependencies = []
-        self.extension_pack = []
+        nodes.append(self)
+        return nodes
+
+
+    def plan_downloads(self) -> List[Tuple[str, str]]:
+        """
+        Get the list of files that need to be downloaded for this extension,
+        its dependencies, and its extension pack items, without actually
+        downloading anything.
+
+        Returns:
+            A list of (download url, file name) tuples, in the order given by
+            collect_unique().
+        """
+        return [(x.download_url, x.download_file_name)
+                for x in self.collect_unique(set())]
 
 
     def download(self, remote_dir: str, local_dir: str) -> str:
         """
-        Download the .vsix extension.
+        Download the .vsix extension, along with its dependencies and
+        extension pack items.
 
-        Communicate to the tunnel instance to download the extension on the
-        remote machine and then copy it to the specified location on the
-        local machine.
+        Communicate to the tunnel instance to download the extensions on the
+        remote machine (using a single curl command) and then copy them to the
+        specified location on the local machine.
 
         Arguments:
             remote_dir -- Absolute path to the download dir on the remote host
             local_dir -- Absolute path to the download dir on the local host
 
         Returns
-            The absolute path to the downloaded file on the local machine
+            The absolute paths to the downloaded files on the local machine
             (if sucessful). If unsuccessful, returns False.
 
         """
-        downloaded_extension_paths = []
-
-        # Check for extension dependencies and extension pack items.
-        num_dependencies = len(self.extension_dependencies)
-        num_extension_pack = len(self.extension_pack)
-
-        # Process any extension dependencies before the current extension.
-        if num_dependencies > 0:
-            _LOGGER.info('%s has %d extension dependencies.',
-                         self.unique_id, num_dependencies)
-
-            for _, extension in enumerate(self.extension_dependencies):
-                downloaded_extension_paths.extend(
-                    extension.download(remote_dir, local_dir))
-
-            _LOGGER.debug('All %s dependencies processed', self.unique_id)
-
-        # Process extension pack items before the current extension.
-        if num_extension_pack > 0:
-            _LOGGER.info('%s has %s extensions in extension pack.',
-                         self.unique_id, num_extension_pack)
+        plan = self.plan_downloads()
+        downloads = [(url, _remote_path(remote_dir, file_name))
+                     for url, file_name in plan]
+
+        if _LOGGER.isEnabledFor(logging.INFO):
+            for _, file_name in plan:
+                _LOGGER.info('Downloading %s', file_name)
+
+        # Download all of the extensions with a single curl command. HTTP
+        # errors fail a download instead of saving the error page.
+        curled_request = _REQUEST_CURLER.get_files(
+            downloads, fail=True, write_out=_DOWNLOAD_STATUS_FORMAT)
+        response = self.tunnel.run(curled_request)
 
-            for _, extension in enumerate(self.extension_pack):
-                downloaded_extension_paths.extend(
-                    extension.download(remote_dir, local_dir))
+        # Retry any download that didn't succeed on its own, so we can tell
+        # which of them failed.
+        downloaded = _downloaded_paths(response.stdout)
+        retries = [(url, file_name) for url, file_name in plan
+                   if _remote_path(remote_dir, file_name) not in downloaded]
+
+        if retries:
+            _LOGGER.debug(response.stderr)
+            failed = {file_name for url, file_name in retries
+                      if not self._download_file(
+                          url, _remote_path(remote_dir, file_name))}
+            plan = [x for x in plan if x[1] not in failed]
+
+        file_names = [file_name for _, file_name in plan]
+        if self.download_file_name not in file_names:
+            return False
 
-            _LOGGER.debug('All %s extension pack extensions processed',
-                          self.unique_id)
+        # Transfer all of the downloaded extensions from the remote machine to
+        # the local machine at once.
+        self.tunnel.get_files(remote_dir, file_names, local_dir)
+        local_paths = [os.path.join(local_dir, x) for x in file_names]
 
-        # Download the current extension.
-        extension_name = self.unique_id
-        _LOGGER.info('Downloading %s', extension_name)
+        # Pass the local paths back to the caller, with the dependencies and
+        # extension pack items ahead of the extensions that require them.
+        return local_paths
 
-        # If a specific version of the extension is known, append that version
-        # to the name of the extension (for added specificity).
-        if hasattr(self, 'version'):
-            extension_name = f'{extension_name}-{self.version}'
 
-        # In any case, append the .vsix extension to the extension file name.
-        # .vsix is universal to all VSCode extensions.
-        extension_file = f'{extension_name}.vsix'
+    def _download_file(self, url: str, remote_path: str) -> bool:
+        """
+        Download a single file on the remote machine.
 
-        # Specify the paths to where we'll download the extension on the remote
-        # system and where we'll transfer it to on the local system.
-        remote_path = os.path.join(remote_dir, extension_file)
-        local_path = os.path.join(local_dir, extension_file)
+        Arguments:
+            url -- The url to download
+            remote_path -- The path to download the file to on the remote host
 
-        # Build the curled request and send it through the tunnel.
-        curled_request = _REQUEST_CURLER.get(self.download_url,
-                                             output=remote_path)
+        Returns:
+            True if the download was successful, False if not.
+        """
+        curled_request = _REQUEST_CURLER.get(url, output=remote_path,
+                                             fail=True)
         response = self.tunnel.run(curled_request)
 
-        # If the download request had any issues, then we won't try to transfer
-        # the extension from the remote machine to the local machine.
         if response.exited != 0:
-            _LOGGER.error('Failed to download %s.', extension_name)
+            _LOGGER.error('Failed to download %s.',
+                          posixpath.basename(remote_path))
             _LOGGER.error(response.stderr)
             return False
-
-        # Otherwise, we assume the request succeeded, so we'll try to transfer
-        # the extension file.
-        self.tunnel.get(remote_path, local_path)
-
-        # Append the current extension's local path to the list of downloaded
-        # extension paths that we'll pass back to the caller.
-        downloaded_extension_paths.append(local_path)
-        return downloaded_extension_paths
+        return True
 
 
 
@@ -154,9 +241,11 @@ class GithubExtension(Extension):
         self.asset_name = asset_name
         self.release = release
         self.prerelease = prerelease
+        # Only a pre-release needs the releases API, since GitHub redirects
+        # any other release's asset (including the latest one) to its file.
         self.download_url = (
             self._download_url_from_latest() if release == 'latest'
-            else self._download_url_from_args())
+            and prerelease else self._download_url_from_args())
 
         super().__init__(unique_id=self.unique_id,
                          download_url=self.download_url,
@@ -180,7 +269,9 @@ class GithubExtension(Extension):
 
     def _download_url_from_latest(self) -> str:
         """
-        Get the download URL for the latest version of this extension.
+        Get the download URL for the latest release of this extension,
+        including pre-releases. (The latest non-prerelease release doesn't
+        need a query, see _download_url_from_args().)
 
         Build the extension download url by finding the latest extension that
         matches the system platform and release specifications.
@@ -188,39 +279,22 @@ class GithubExtension(Extension):
         Returns:
             The direct url from which the extension can be downlaoded
         """
-        if not self.prerelease:
-            # By default, GitHub's API only shows non-prerelease assets at the
-            # 'latest' endpoint, so if we don't allow pre-releases, we can just
-            # append 'latest' to our API URL and use the resulting asset.
-            endpoint = f'repos/{self.owner}/{self.repo}/releases/' \
-                       f'{self.release}?per_page=1'
-        else:
-            # If we DO want to allow pre-release assets, we won't add 'latest'
-            # to the end of our query URL, which will allow a prerelease asset
-            # to be the first item in the list (if, in fact, a prerelease asset
-            # exists and is the latest asset).
-            #
-            # Note that this will still fetch a non-prerelease/stable asset if
-            # the latest asset is non-prerelsease/stable.
-            endpoint = f'repos/{self.owner}/{self.repo}/releases?per_page=1'
-
-        # Build the query complete URL and the cURLed GET request, then
-        # send the request via the tunnel connection provided to the extension.
-        url = f'{_GITHUB_API_ROOT_URI}/{endpoint}'
-        curled_request = _REQUEST_CURLER.get(url)
-        response = self.tunnel.run(curled_request)
+        # GitHub's 'latest' endpoint only shows non-prerelease assets, so the
+        # release list is queried instead, which has a prerelease asset as the
+        # first item (if, in fact, a prerelease asset exists and is the latest
+        # asset).
+        #
+        # Note that this will still fetch a non-prerelease/stable asset if the
+        # latest asset is non-prerelsease/stable.
+        endpoint = f'repos/{self.owner}/{self.repo}/releases?per_page=1'
 
-        # If the GET request was successful, then parse the JSON response and
-        # parse the asset's download URL.
-        if response.exited == 0:
-            response = json.loads(response.stdout)
-            response_obj = response[0] if self.prerelease else response
-            asset_list = response_obj['assets']
-            return self._get_download_url_from_asset_list(asset_list)
+        # If the request was successful, then parse the asset's download URL.
+        response = _github_api_get(self.tunnel, endpoint)
+        if response is None:
+            return None
 
-        # Tunnel run request did not exit 0.
-        _LOGGER.error(response.stderr)
-        return None
+        asset_list = response[0]['assets']
+        return self._get_download_url_from_asset_list(asset_list)
 
 
     def _download_url_from_args(self) -> str:
@@ -230,8 +304,14 @@ class GithubExtension(Extension):
         Returns:
             The direct url from which the extension can be downlaoded
         """
-        query_endpoint = f'{self.owner}/{self.repo}/releases/download/' \
-                         f'{self.release}/{self.asset_name}'
+        if self.release == 'latest':
+            # GitHub redirects this to the asset of the latest (non-prerelease)
+            # release, so we don't need to query and parse the release itself.
+            query_endpoint = f'{self.owner}/{self.repo}/releases/latest/' \
+                             f'download/{self.asset_name}'
+        else:
+            query_endpoint = f'{self.owner}/{self.repo}/releases/download/' \
+                             f'{self.release}/{self.asset_name}'
         return f'{_GITHUB_ROOT_URI}/{query_endpoint}'
 
 
@@ -261,8 +341,13 @@ class MarketplaceExtension(Extension):
         # objects directly, but we need them to find the values of other
         # attributes that we do want to store.
         version = response['versions'][0]
-        files = version['files']
-        properties = version['properties']
+
+        # Index the files by asset type and the properties by key, so each of
+        # them can be looked up without scanning the lists again. Where a key
+        # appears more than once, the first item wins.
+        files = {x.get('assetType'): x for x in reversed(version['files'])}
+        properties = {x.get('key'): x
+                      for x in reversed(version['properties'])}
 
         # TODO: We may not need all this URI information.
         self.uri = AttributeDict({
@@ -281,19 +366,29 @@ class MarketplaceExtension(Extension):
 
         # Find out if this is an extension pack. If so, we'll need to download
         # each of the extensions in the pack whenever this extension downloads.
-        self.extension_pack = self._extension_pack(properties)
+        pack_ids = self._extension_pack(properties)
 
         # Find out if this extension has dependencis. If so, we'll need to
         # download and install each of the dependencies before we download/
         # install this extension.
-        self.extension_dependencies = self._extension_dependencies(properties)
+        dependency_ids = self._extension_dependencies(properties)
+
+        # Create a new Extension instance for each of the extensions in the
+        # extension pack and each of the dependencies (only once for any
+        # extension that's in both).
+        extensions = self._get_extensions(*pack_ids, *dependency_ids)
+        self.extension_pack = [extensions[x] for x in pack_ids]
+        self.extension_dependencies = [extensions[x] for x in dependency_ids]
 
         super().__init__(unique_id=self.unique_id,
                          download_url=self.uri.vsix_package,
+                         version=self.version,
+                         extension_pack=self.extension_pack,
+                         extension_dependencies=self.extension_dependencies,
                          tunnel=self.tunnel)
 
 
-    def _manifest_url(self, files: List[str]) -> str:
+    def _manifest_url(self, files: Dict[str, Any]) -> str:
         """
         Read the extension files to determine the URI to the manifset
         file for this extension. If desired, an additional request could
@@ -301,126 +396,248 @@ class MarketplaceExtension(Extension):
         extension.
 
         Arguments:
-            files -- A list of extension files associated with this extension.
-                    This comes from the JSON response that resulted from
-                    querying this extension in the VSCode Extension Marketplace.
+            files -- The extension files associated with this extension, by
+                    asset type. This comes from the JSON response that
+                    resulted from querying this extension in the VSCode
+                    Extension Marketplace.
 
         Returns:
             The URI of the manifest file for the current extension.
         """
-        key = 'assetType'
-        value = 'Microsoft.VisualStudio.Code.Manifest'
-        match = dict_from_list_key(files, key, value)
+        match = files.get('Microsoft.VisualStudio.Code.Manifest')
         return match['source'] if match else None
 
 
-    def _vsix_package_uri(self, files: List[str]) -> str:
+    def _vsix_package_uri(self, files: Dict[str, Any]) -> str:
         """
         Read the extension files to determine the URI to the .VSIXPackage
         file (which is an alias for the .vsix) for this extension. This is
         the URI of where the extension can be downloaded.
 
         Arguments:
-            files -- A list of extension files associated with this extension.
-            This comes from the JSON response that resulted from querying this
-            extension in the VSCode Extension Marketplace.
+            files -- The extension files associated with this extension, by
+            asset type. This comes from the JSON response that resulted from
+            querying this extension in the VSCode Extension Marketplace.
 
         Returns:
             The URI of where the .vsix can be downloaded from the
             VSCode Marketplace.
         """
-        key = 'assetType'
-        value = 'Microsoft.VisualStudio.Services.VSIXPackage'
-        match = dict_from_list_key(files, key, value)
+        match = files.get('Microsoft.VisualStudio.Services.VSIXPackage')
         return match['source'] if match else None
 
 
-    def _code_engine(self, properties: List[str]) -> str:
+    def _code_engine(self, properties: Dict[str, Any]) -> str:
         """
         Read the extension properties to determine which VSCode engine
         is required for this extension (at it's current/specified version).
 
         Arguments:
-            properties -- A list of extension properties from the JSON response
-            that resulted from querying this extension in the VSCode Extension
-            Marketplace
+            properties -- The extension properties (by key) from the JSON
+            response that resulted from querying this extension in the VSCode
+            Extension Marketplace
 
         Returns:
             The version of VSCode required for this extension.
         """
-        key = 'key'
-        value = 'Microsoft.VisualStudio.Code.Engine'
-        match = dict_from_list_key(properties, key, value)
+        match = properties.get('Microsoft.VisualStudio.Code.Engine')
         return match['value'] if match else None
 
 
-    def _extension_pack(self, properties: List[str]) -> List[Extension]:
+    @staticmethod
+    def _extension_pack(properties: Dict[str, Any]) -> List[str]:
         """
         Read the extension properties to determine which VSCode extensions are
-        included in this extension pack (if any). Return a list of Extension
-        objects corresponding to each of the extensions in the extension pack.
+        included in this extension pack (if any).
 
         NOTE: Only Extensions which are extension packs will have any value
         here.
 
         Arguments:
-            properties -- A list of extension properties from the JSON response
-            that resulted from querying this extension in the VSCode Extension
-            Marketplace
+            properties -- The extension properties (by key) from the JSON
+            response that resulted from querying this extension in the VSCode
+            Extension Marketplace
 
         Returns:
-            A list of Extension objects, one for each named extension in the
-            extension pack property value for this extension.
+            A list of the unique ids of the extensions in the extension pack.
         """
+        match = properties.get('Microsoft.VisualStudio.Code.ExtensionPack')
+        if not match:
+            return []
+        return list(filter(None, match['value'].split(',')))
 
-        key = 'key'
-        value = 'Microsoft.VisualStudio.Code.ExtensionPack'
-        match = dict_from_list_key(properties, key, value)
-        extension_pack = []
 
-        if match:
-            extension_pack_string = match['value']
-            extension_names = [x for x in extension_pack_string.split(',') if x]
+    @staticmethod
+    def _extension_dependencies(properties: Dict[str, Any]) -> List[str]:
+        """
+        Read the extension properties to determine which VSCode extensions are
+        dependencies of this extension (if any).
 
-            # Create a new Extension instance for each of the extensions in the
-            # extension pack and append those Extension objects to the
-            # extension_pack list.
-            for name in extension_names:
-                extension_pack.append(get_extension(name, self.tunnel))
+        Arguments:
+            properties -- The extension properties (by key) from the JSON
+            response that resulted from querying this extension in the VSCode
+            Extension Marketplace
 
-        return extension_pack
+        Returns:
+            A list of the unique ids of the dependency extensions.
+        """
+        match = properties.get(
+            'Microsoft.VisualStudio.Code.ExtensionDependencies')
+        if not match:
+            return []
+        return list(filter(None, match['value'].split(',')))
 
 
-    def _extension_dependencies(self, properties: List[str]) -> List[Extension]:
+    def _get_extensions(self, *unique_ids: str) -> Dict[str, Extension]:
         """
-        Read the extension properties to determine which VSCode extensions are
-        dependencies of this extension (if any). Return a list of Extension
-        objects corresponding to each of the dependency extensions.
+        Create an Extension instance for each of the unique ids. The
+        extensions are looked up in a single marketplace query, and then the
+        instances (which look up their own dependencies) are created
+        concurrently.
 
         Arguments:
-            properties -- A list of extension properties from the JSON response
-            that resulted from querying this extension in the VSCode Extension
-            Marketplace
+            unique_ids -- The unique ids of the extensions
 
         Returns:
-            A list of Extension objects, one for each named dependency.
+            A dict of Extension instances, by unique id.
         """
-        key = 'key'
-        value = 'Microsoft.VisualStudio.Code.ExtensionDependencies'
-        match = dict_from_list_key(properties, key, value)
-        dependencies = []
+        unique_ids = set(unique_ids)
+        if not unique_ids:
+            return {}
+
+        # connect up front, so the threads don't race to connect
+        if self.tunnel is not None:
+            self.tunnel.ensure_connection()
+
+        # Query the marketplace for all of the extensions at once. Creating
+        # each Extension instance then reuses its query result, so only the
+        # queries for their own dependencies run concurrently.
+        Marketplace(tunnel=self.tunnel).get_extensions(list(unique_ids))
+
+        max_workers = min(_MAX_QUERY_WORKERS, len(unique_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {x: executor.submit(get_extension, x, self.tunnel)
+                       for x in unique_ids}
+            return {x: future.result() for x, future in futures.items()}
+
+
+
+def _remote_path(remote_dir: str, file_name: str) -> str:
+    """
+    Join a file name to a directory on the remote host. The remote host is
+    always a posix system, regardless of the local system's path flavor.
+    """
+    return posixpath.join(remote_dir, file_name)
+
+
+def _downloaded_paths(output: str) -> Set[str]:
+    """
+    Get the paths of the files that a batched curl download (see
+    _DOWNLOAD_STATUS_FORMAT) saved successfully.
+
+    Arguments:
+        output -- The output of the curl request
 
-        if match:
-            dependencies_string = match['value']
-            extension_names = [x for x in dependencies_string.split(',') if x]
+    Returns:
+        The output paths of the downloads that got a 2xx response
+    """
+    paths = set()
+    for line in output.splitlines():
+        status, _, path = line.partition(' ')
+        if status.startswith('2') and path:
+            paths.add(path)
+    return paths
 
-            # Create a new Extension instance for each of the extensions and
-            # append those Extension objects to the dependencies list.
-            for name in extension_names:
-                dependencies.append(get_extension(name, self.tunnel))
 
-        return dependencies
+def _split_http_response(output: str) -> Tuple[int, Dict[str, str], str]:
+    """
+    Split the output of a curl request that included the response headers
+    into the status code, the headers, and the body of the (final) response.
 
+    Arguments:
+        output -- The output of the curl request
+
+    Returns:
+        A (status code, headers, body) tuple. The header names are lowercase.
+    """
+    head, body = '', output
+    while body.startswith('HTTP/'):
+        parts = _HTTP_HEAD_END_RE.split(body, maxsplit=1)
+        head, body = parts[0], parts[1] if len(parts) > 1 else ''
+
+    status_line, *header_lines = head.splitlines()
+    headers = {}
+    for line in header_lines:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return int(status_line.split()[1]), headers, body
+
+
+@lru_cache(maxsize=256)
+def _github_api_get(tunnel: Tunnel, endpoint: str) -> Any:
+    """
+    Get a (parsed) response from the GitHub API through the tunnel.
+
+    Responses are reused for the rest of the program. They're also cached on
+    disk along with their ETag, so later runs can revalidate them with an
+    If-None-Match request. GitHub answers those with an empty 304 response
+    (which doesn't count against the API rate limit) if nothing changed.
+
+    Arguments:
+        tunnel -- SSH Tunnel instance
+        endpoint -- The API endpoint, relative to the API root url
+
+    Returns:
+        The parsed JSON response, or None if the request failed.
+    """
+    url = f'{_GITHUB_API_ROOT_URI}/{endpoint}'
+    cache_key = 'github.' + re.sub(r'[^\w.-]', '_', endpoint)
+    cached = load_cached(cache_key, fingerprint=url)
+
+    headers = {'If-None-Match': cached['etag']} if cached else None
+    curled_request = _REQUEST_CURLER.get(url, headers=headers,
+                                         include_headers=True)
+    response = tunnel.run(curled_request)
+
+    # Tunnel run request did not exit 0.
+    if response.exited != 0:
+        _LOGGER.error(response.stderr)
+        return None
+
+    status, response_headers, body = _split_http_response(response.stdout)
+    if status == 304 and cached:
+        return cached['body']
+
+    parsed = _json_loads(body)
+    if status == 200 and 'etag' in response_headers:
+        store_cached(cache_key, {'etag': response_headers['etag'],
+                                 'body': parsed}, fingerprint=url)
+    return parsed
+
+
+@lru_cache(maxsize=None)
+def _non_marketplace_extension(unique_id: str) -> AttributeDict:
+    """
+    Get the download source of an extension that isn't downloaded from the
+    marketplace, with the asset name for the current platform.
+
+    Arguments:
+        unique_id -- The unique id of the extension
+
+    Returns:
+        An AttributeDict with the owner, repo, and asset_name of the
+        extension, or None if the extension is downloaded from the
+        marketplace.
+    """
+    extension = _NON_MARKETPLACE_EXTENSIONS.get(unique_id)
+    if extension is None:
+        return None
+
+    return AttributeDict({
+        'owner': extension['owner'],
+        'repo': extension['repo'],
+        'asset_name': platform_query(**extension['asset_names']),
+    })
 
 
 def get_extension(unique_id: str,
@@ -441,7 +658,7 @@ def get_extension(unique_id: str,
         An instance of an Extension, either a GithubExtension or
         a MarketplaceExtension
     """
-    extension = _NON_MARKETPLACE_EXTENSIONS.get(unique_id)
+    extension = _non_marketplace_extension(unique_id)
 
     if extension is None or use_marketplace_only:
         marketplace = Marketplace(tunnel=tunnel)
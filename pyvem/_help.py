@@ -2,9 +2,10 @@
 Help output message
 """
 
-import re
+from functools import lru_cache
+from itertools import chain
 from textwrap import dedent
-from typing import Tuple
+from typing import Dict, Tuple
 
 from rich.console import Console
 from rich.text import Text, Lines
@@ -16,7 +17,6 @@ from rich.theme import Theme
 _DEFAULT_WRAP_WIDTH = 80
 _DEFAULT_PAD_SIZE = 4
 
-_text = Text(tab_size=4)
 _console = Console(theme=rich_theme)
 
 
@@ -54,6 +54,9 @@ def _current_wrap_width() -> int:
     Helps determine the current width at which console text should
     wrap by finding the min of the current width and the default wrap width.
 
+    The shell dimensions are checked each time help is rendered (which only
+    takes a single ioctl), so a resized terminal is always picked up.
+
     Returns:
         int -- The number of columns at which the current console will wrap.
     """
@@ -61,27 +64,58 @@ def _current_wrap_width() -> int:
     return min(_column_width, _DEFAULT_WRAP_WIDTH)
 
 
-def _wrap_for_console(content: str) -> Lines:
+@lru_cache(maxsize=64)
+def _parse_markup(content: str) -> Text:
+    """
+    Parses the markup of a help string. Each help string is static, so it's
+    only parsed once, no matter how many times (or widths) it's wrapped to.
+
+    Arguments:
+        content -- a string that may include rich markup
+
+    Returns:
+        A rich.Text instance
+    """
+    return Text.from_markup(dedent(content).strip())
+
+
+@lru_cache(maxsize=64)
+def _wrap_for_console_cached(content: str, width: int) -> Lines:
     """
-    Wraps a string such that it fits within the current console width, while
-    padding each line of the wrapped text with a specified amount of padding.
+    Wraps a string to a given console width, while padding each line of the
+    wrapped text with a specified amount of padding. The result only depends
+    on the arguments, so the wrapped text of each help section is cached.
 
     Arguments:
         content -- a string to wrap
-        padsize -- the number of spaces to pad the content.
+        width -- the number of columns at which the console will wrap
 
     Returns:
         A rich.Text instance, ready to be printed with a rich.Console.
     """
-    text = _text.from_markup(dedent(content).strip())
-    text = text.wrap(console=_console,
-                     width=_current_wrap_width() - _DEFAULT_PAD_SIZE,
-                     justify=True, tab_size=4)
+    text = _parse_markup(content).wrap(console=_console,
+                                       width=width - _DEFAULT_PAD_SIZE,
+                                       justify=True, tab_size=4)
     for line in text:
         line.pad_left(_DEFAULT_PAD_SIZE)
     return text
 
 
+@lru_cache(maxsize=None)
+def _section_heading(name: str) -> Text:
+    """
+    Get the rich-formatted heading of a help section.
+
+    Arguments:
+        name -- The section name.
+
+    Returns:
+        Text -- the rich-formatted section heading
+    """
+    name = name.upper().replace('_', '-')
+    return Text.from_markup(_rich_command_heading('\n{}'.format(name)))
+
+
 class Help():
     """Help class implementation"""
     # pylint: disable=too-many-arguments
@@ -109,8 +143,12 @@ class Help():
         if self.brief:
             self.heading += ' -- ' + self.brief
 
+        # the rendered help sections, by the width they were wrapped to.
+        self._sections: Dict[int, tuple] = {}
+
 
-    def _rich_section(self, name: str, content: str) -> Tuple[Text, Lines]:
+    def _rich_section(self, name: str, content: str,
+                      width: int) -> Tuple[Text, Lines]:
         """
         Uses an underscored property name to generate both a heading for the
         corresponding help section and format the content for the body of the
@@ -119,35 +157,38 @@ class Help():
         Arguments:
             name -- The section name.
             content -- The help content to display for the section.
+            width -- The number of columns at which the console will wrap.
 
         Returns:
             A tuple of two rich objects:
                 Text - the rich-formatted section heading
                 Lines - the rich-formatted section body
         """
-        name = name.upper().replace('_', '-')
-        heading = _text.from_markup(_rich_command_heading('\n{}'.format(name)))
-        body = _wrap_for_console(content)
-        return heading, body
+        return _section_heading(name), _wrap_for_console_cached(content, width)
 
 
     def print_help(self) -> None:
         """Print the help output"""
 
-        parts = list()
-
-        for part in [
-            ('NAME', self.heading),
-            ('SYNOPSIS', self.synopsis),
-            ('DESCRIPTION', self.description),
-            ('Sub-Commands', self.sub_commands),
-            ('OPTIONS', self.options),
-            ('ADDITIONAL DETAILS', self.additional_details),
-        ]:
-            if part[1]:
-                parts.append(self._rich_section(*part))
-
-        parts = sum(tuple(parts), ())
+        width = _current_wrap_width()
+        parts = self._sections.get(width)
+
+        if parts is None:
+            parts = list()
+
+            for part in [
+                ('NAME', self.heading),
+                ('SYNOPSIS', self.synopsis),
+                ('DESCRIPTION', self.description),
+                ('Sub-Commands', self.sub_commands),
+                ('OPTIONS', self.options),
+                ('ADDITIONAL DETAILS', self.additional_details),
+            ]:
+                if part[1]:
+                    parts.append(self._rich_section(*part, width))
+
+            parts = tuple(chain.from_iterable(parts))
+            self._sections[width] = parts
 
         # Print the paged help info
         with _console.pager(styles=True):
@@ -1,19 +1,38 @@
 """Logging helpers"""
 
 import logging
+from typing import Dict
 
 import rich.console
 import rich.logging
 
 from pyvem._config import rich_theme
 
+# The console that loggers write to unless they're given their own.
+_CONSOLE = rich.console.Console(theme=rich_theme)
+
+# The loggers that were already set up, by name.
+_LOGGERS: Dict[str, logging.Logger] = {}
+
+
+def _level_number(level) -> int:
+    """
+    Convert a log level name (e.g. 'info') or number to a log level number.
+    An unknown level name is treated as DEBUG.
+    """
+    if isinstance(level, int):
+        return level
+
+    log_level = logging.getLevelName(str(level).upper())
+    return log_level if isinstance(log_level, int) else logging.DEBUG
+
 
 def get_rich_logger(
     name: str,
     level: str = 'DEBUG',
     fmt: str = '%(message)s',
     datefmt: str = '[%X] ',
-    console: rich.console.Console = rich.console.Console(theme=rich_theme),
+    console: rich.console.Console = None,
 ) -> logging.Logger:
     """
     Create and return a logger of a given name and logging level.
@@ -22,25 +41,30 @@ def get_rich_logger(
         name -- The name of the logger to return.
 
     Keyword Arguments:
-        level {logging.level} -- A log level (default: {'DEBUG'})
+        level {str|int} -- A log level name or number (default: {'DEBUG'})
         fmt {str} -- A logging format (default: {'%(message)s'})
         datefmt {str} -- A logging date format (default: {'[%X] '})
         console {rich.console} -- An optional rich console to use for the
-        logging output (default: {None})
+        logging output. If None, a console shared by all loggers is used.
+        (default: {None})
 
     Returns:
         logging.logger
     """
-    log_level = logging.getLevelName(level)
-    if log_level == f'Level {level}':
-        log_level = logging.DEBUG
+    # A logger that was already set up is returned as-is, rather than
+    # building another handler (and formatter) for it.
+    if name in _LOGGERS:
+        return _LOGGERS[name]
+
+    log_level = _level_number(level)
 
     formatter = logging.Formatter(fmt=fmt, datefmt=datefmt)
-    handler = rich.logging.RichHandler(console=console)
+    handler = rich.logging.RichHandler(console=console or _CONSOLE)
     handler.setFormatter(formatter)
 
     logger = logging.getLogger(name)
     logger.handlers = [handler]
     logger.setLevel(log_level)
+    _LOGGERS[name] = logger
 
     return logger
@@ -5,6 +5,7 @@ import os
 import shutil
 import subprocess
 import sys
+from functools import lru_cache
 
 from pyvem._logging import get_rich_logger
 
@@ -72,10 +73,26 @@ class Machine():
 # Machine Helper Functions
 #
 
-_MACHINE = Machine()
+@lru_cache(maxsize=None)
+def _get_machine() -> Machine:
+    """
+    Get the Machine instance describing the current system. It's only created
+    (which may involve running a shell to find the package manager) the first
+    time it's needed.
+    """
+    return Machine()
+
+
+def _first_truthy(*values):
+    """
+    Return the first truthy value of the given values (or None if none of
+    them are truthy).
+    """
+    return next((x for x in values if x), None)
 
 
 # pylint: disable=too-many-arguments, too-many-locals, too-many-branches
+@lru_cache(maxsize=None)
 def platform_query(
         windows='windows',
         win32=None,
@@ -161,37 +178,39 @@ def platform_query(
     Raises:
         OSError -- If no match can be determined from the provided arguments and system attributes.
     """
-    machine_os = _MACHINE.operating_system
-    machine_arch = _MACHINE.arch_size
-    machine_pkg_mgr = _MACHINE.package_manager
+    machine = _get_machine()
+    machine_os = machine.operating_system
+    machine_arch = machine.arch_size
+    machine_pkg_mgr = machine.package_manager
+    result = None
 
     if machine_os == 'darwin':
         result = darwin
 
     elif machine_os == 'windows':
         if machine_arch == 32:
-            result = next(win32, windows)
+            result = _first_truthy(win32, windows)
         else:
-            result = next(win64, windows)
+            result = _first_truthy(win64, windows)
 
     elif machine_os == 'linux':
         if machine_pkg_mgr == 'rpm':
             if machine_arch == 32:
-                result = next(rpm32, rpm, linux32, linux)
+                result = _first_truthy(rpm32, rpm, linux32, linux)
             else:
-                result = next(rpm64, rpm, linux64, linux)
+                result = _first_truthy(rpm64, rpm, linux64, linux)
 
         elif machine_pkg_mgr in ['dpkg', 'apt-get']:
             if machine_arch == 32:
-                result = next(deb32, deb, linux32, linux)
+                result = _first_truthy(deb32, deb, linux32, linux)
             else:
-                result = next(deb64, deb, linux64, linux)
+                result = _first_truthy(deb64, deb, linux64, linux)
 
         else:
             if machine_arch == 32:
-                result = next(linux32, linux)
+                result = _first_truthy(linux32, linux)
             else:
-                result = next(linux64, linux)
+                result = _first_truthy(linux64, linux)
 
     if not result:
         raise OSError('The current platform is not supported')
@@ -210,7 +229,7 @@ def install_dmg(dmg_file_path):
         dmg_file_path {str} -- The absolute path to the .dmg file.
     """
     # dmgs are darwin-only
-    assert _MACHINE.operating_system == 'darwin'
+    assert _get_machine().operating_system == 'darwin'
 
     # mount the dmg image
     proc = subprocess.Popen(['hdiutil', 'attach', dmg_file_path],
@@ -257,7 +276,7 @@ def install_zip(zipped_path):
     Arguments:
         zipped_path {str} -- Absolute path to the .zip location
     """
-    if _MACHINE.operating_system != 'darwin':
+    if _get_machine().operating_system != 'darwin':
         raise OSError('Your OS does not support installing VSCode editors from a .zip')
 
     os.system('unzip -q -o {} -d {}'.format(zipped_path, _DARWIN_INSTALL_LOCATION))
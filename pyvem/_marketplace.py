@@ -1,17 +1,32 @@
 """Connect to and query the VSCode marketplace."""
 
-import json
-from textwrap import dedent
+from types import MappingProxyType
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from functools import reduce
-from typing import Dict, List, Any
+from functools import lru_cache, reduce
+from operator import or_
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 from numbers import Number
 
+# orjson is an optional (and much faster) drop-in for decoding JSON responses.
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
+# msgspec is an optional decoder for the envelope of extension query responses.
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
 from rich.console import Console
 
+from pyvem._cache import cached_run
 from pyvem._logging import get_rich_logger
 from pyvem._curler import CurledRequest
-from pyvem._util import dict_from_list_key, human_number_format
+from pyvem._util import human_number_format
 from pyvem._models import (
     ExtensionQueryFilterType,
     ExtensionQueryFlags,
@@ -20,27 +35,140 @@ from pyvem._models import (
 
 _MARKETPLACE_BASE_URL = 'https://marketplace.visualstudio.com'
 _MARKETPLACE_API_VERSION = '6.0-preview.1'
-_MARKETPLACE_DEFAULT_FLAGS = [
-    ExtensionQueryFlags.AllAttributes,
-    ExtensionQueryFlags.IncludeLatestVersionOnly,
-]
+
+# The most marketplace queries to make at the same time.
+_MAX_QUERY_WORKERS = 8
+
+# Query flags are combined into a single bitmask. The ones that are used as
+# defaults are combined up front. Callers may also pass a list of flags.
+QueryFlags = Union[int, List[int]]
+_MARKETPLACE_DEFAULT_FLAGS = (ExtensionQueryFlags.AllAttributes |
+                              ExtensionQueryFlags.IncludeLatestVersionOnly)
+_LATEST_VERSION_FLAGS = ExtensionQueryFlags.IncludeLatestVersionOnly
+
+# Search results only display the latest version and the statistics of each
+# extension (along with the basic details, which every query includes), so
+# searches don't ask for the rest of the extensions' attributes.
+_SEARCH_FLAGS = (ExtensionQueryFlags.IncludeVersions |
+                 ExtensionQueryFlags.IncludeStatistics |
+                 ExtensionQueryFlags.IncludeLatestVersionOnly)
+
+# The headers of every extension query. There's no Accept-Encoding header,
+# since curl's --compressed option already asks for every encoding the remote
+# curl can decode (e.g. brotli, where it's supported, rather than only gzip).
+_MARKETPLACE_HEADERS = MappingProxyType({
+    'Accept': f'application/json;api-version={_MARKETPLACE_API_VERSION}',
+    'Content-Type': 'application/json',
+})
+
+
+def _criterion(filter_type: int, value: str) -> Dict[str, Any]:
+    """
+    Build an extension query criterion, which filters the query's results by
+    an ExtensionQueryFilterType and a value.
+    """
+    return {'filterType': filter_type, 'value': value}
+
+
+# The query criterion that limits the results to VSCode extensions. It's
+# shared by every query, so it must not be changed.
+_VSCODE_CRITERION = _criterion(ExtensionQueryFilterType.InstallationTarget,
+                               'Microsoft.VisualStudio.Code')
+
+# The formats of the marketplace's timestamps, by the character that follows
+# the seconds (e.g. '2020-06-10T17:47:16.29Z').
+_MARKETPLACE_DATE_FORMATS = {
+    '.': '%Y-%m-%dT%H:%M:%S.%fZ',
+    ':': '%Y-%m-%dT%H:%M:%S:%fZ',
+    'Z': '%Y-%m-%dT%H:%M:%SZ',
+}
+
+# A row of search results, with its fields in the order they're displayed.
+SearchResult = namedtuple('SearchResult', [
+    'extension_id',
+    'version',
+    'last_update',
+    'rating',
+    'installs',
+    'description',
+])
 
 _CONSOLE = Console()
 _LOGGER = get_rich_logger(__name__, console=_CONSOLE)
 
+# Install counts are whole numbers, and the same counts tend to be formatted
+# repeatedly (e.g. while paging through search results).
+_human_installs = lru_cache(maxsize=1024)(human_number_format)
+
+# The curl commands of every marketplace query (and extension download) are
+# built by the same CurledRequest, rather than by one per Marketplace instance.
+_REQUEST_CURLER = CurledRequest()
+
+
+if msgspec is not None:
+    # The parts of an extension query response that are actually used. Any
+    # other keys of the envelope (e.g. the result metadata, which holds counts
+    # of every category of a search's results) are skipped while decoding.
+    # The extensions themselves stay dicts, since that's what their consumers
+    # (and the cache) expect.
+    class _QueryResult(msgspec.Struct):
+        extensions: List[Dict[str, Any]] = []
+
+    class _QueryResponse(msgspec.Struct):
+        results: List[_QueryResult] = []
+        message: Optional[str] = None
+
+    _QUERY_RESPONSE_DECODER = msgspec.json.Decoder(_QueryResponse)
+else:
+    _QUERY_RESPONSE_DECODER = None
+
+
+def _flag_mask(flags: QueryFlags) -> int:
+    """
+    Combine a list of ExtensionQueryFlags into a single bitmask. A bitmask
+    (e.g. one of the module's precomputed flags) is returned as-is.
+    """
+    if isinstance(flags, int):
+        return flags
+    return reduce(or_, flags or (), 0)
+
+
+def _has_query_results(output: str) -> bool:
+    """
+    Check whether the output of an extension query holds its results, rather
+    than e.g. an error message or page (which shouldn't be cached).
+    """
+    try:
+        if _QUERY_RESPONSE_DECODER is not None:
+            return bool(_QUERY_RESPONSE_DECODER.decode(output).results)
+        return bool(_json_loads(output).get('results'))
+    except (ValueError, AttributeError):
+        return False
+
 
 class Marketplace():
     """The Marketplace class queries the VSCode Marketplace."""
 
+    # The extensions found by get_extensions() during the current process, by
+    # unique id and query options. These are shared by every instance, since
+    # instances are created for one-off queries (e.g. while resolving an
+    # extension's dependencies).
+    _extensions: Dict[Tuple, Dict[str, Any]] = {}
+
+    # If True, responses cached on disk by earlier runs are not reused (e.g.
+    # when the --no-cache option is given). Fresh responses are still cached.
+    refresh_cache: bool = False
+
     def __init__(self, tunnel=None):
         self.tunnel = tunnel
-        self.request_curler = CurledRequest()
+        self.request_curler = _REQUEST_CURLER
 
 
     def _post(self,
               endpoint: str,
               data: Dict[str, str] = None,
-              headers: Dict[str, str] = None):
+              headers: Dict[str, str] = None,
+              validate: Callable[[str], bool] = None):
         """
         Performs a post request to the marketplace gallery.
 
@@ -50,6 +178,8 @@ class Marketplace():
         Keyword Arguments:
             data -- The data to pass in the post request
             headers -- The headers to pass in the post request
+            validate -- Checks whether a response may be cached (see
+                cached_run())
 
         Returns:
             Requests.response
@@ -57,13 +187,17 @@ class Marketplace():
         url = f'{_MARKETPLACE_BASE_URL}/_apis/public{endpoint}'
         curl_req = self.request_curler.post(url, data=data or {},
                                             headers=headers or {})
-        return self.tunnel.run(curl_req)
+
+        # Marketplace queries are read-only, so identical queries made within
+        # a few minutes of each other can share a response.
+        return cached_run(self.tunnel, curl_req, refresh=self.refresh_cache,
+                          validate=validate)
 
 
     def _extension_query(self,
                          page_number: int = 1,
                          page_size: int = 1,
-                         flags: List[int] = None,
+                         flags: QueryFlags = None,
                          criteria=None,
                          sort_by: int = ExtensionQuerySortByTypes.Relevance):
         """
@@ -72,7 +206,7 @@ class Marketplace():
         Arguments:
             page_number -- which page # of results to fetch
             page_size -- how many results to fetch
-            flags -- list of ExtensionQueryFlags
+            flags -- ExtensionQueryFlags bitmask (or a list of flags)
             criteria -- list of filter criteria objects
 
         Returns:
@@ -85,35 +219,115 @@ class Marketplace():
                 'criteria': criteria or [],
                 'sortBy': sort_by,
             }],
-            'flags': reduce((lambda a, b: a | b), flags) if flags else 0
-        }
-
-        headers = {
-            'Accept': 'application/json;api-version='
-                      f'{_MARKETPLACE_API_VERSION}',
-            'Accept-Encoding': 'gzip',
-            'Content-Type': 'application/json',
+            'flags': _flag_mask(flags)
         }
 
         result = self._post('/gallery/extensionquery', data=data,
-                            headers=headers)
+                            headers=_MARKETPLACE_HEADERS,
+                            validate=_has_query_results)
 
         if result.exited == 0:
-            parsed = json.loads(result.stdout)
-            target_property = 'results'
+            if _QUERY_RESPONSE_DECODER is not None:
+                parsed = _QUERY_RESPONSE_DECODER.decode(result.stdout)
+                if parsed.results:
+                    return parsed.results[0].extensions
+                return parsed.message or []
 
-            if target_property in parsed.keys():
-                return parsed[target_property][0]['extensions']
-            return parsed['message']
+            parsed = _json_loads(result.stdout)
+            if parsed.get('results'):
+                return parsed['results'][0]['extensions']
+            return parsed.get('message') or []
 
         # check stderr
         _LOGGER.error(result.stderr)
         return []
 
 
+    @staticmethod
+    def _extension_key(unique_id: str, flags: QueryFlags = None,
+                       filters: List[Dict[str, Any]] = None) -> Tuple:
+        """
+        Build the key of an extension query result in the cache of extensions
+        that were already found.
+        """
+        return (unique_id.lower(), _flag_mask(flags),
+                tuple(tuple(sorted(x.items())) for x in filters or ()))
+
+
+    def get_extensions(self,
+                       unique_ids: List[str],
+                       flags: QueryFlags = _MARKETPLACE_DEFAULT_FLAGS,
+                       filters: List[Dict[str, Any]] = None
+                       ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the marketplace responses for several extensions, using a single
+        marketplace query for all of them.
+
+        Arguments:
+            unique_ids -- The extension ids
+
+        Keyword Arguments:
+            flags -- An ExtensionQueryFlags bitmask (or a list of flags)
+            filters -- An optional list of additional query criteria, which
+                apply to every one of the extensions
+
+        Returns:
+            dict -- The JSON response of each extension that was found, by
+                (lowercase) unique id.
+        """
+        found = {}
+        missing = []
+
+        # Reuse any extension that the same query already found. (Identical
+        # queries made in earlier runs are also answered from the on-disk
+        # cache in _post.)
+        for unique_id in unique_ids:
+            key = self._extension_key(unique_id, flags, filters)
+            extension = Marketplace._extensions.get(key)
+            if extension is not None:
+                found[key[0]] = extension
+            elif key[0] not in missing:
+                missing.append(key[0])
+
+        if not missing:
+            return found
+
+        # The marketplace matches any one of the Name criteria.
+        criteria = [_VSCODE_CRITERION, *(
+            _criterion(ExtensionQueryFilterType.Name, x) for x in missing)]
+
+        # Append any additional filters that were provided.
+        for query_filter in filters or []:
+            criteria.append(query_filter)
+
+        extensions = self._extension_query(criteria=criteria, flags=flags,
+                                           page_size=len(missing))
+
+        # If the marketplace rejected the combined query, query each of the
+        # extensions on its own (concurrently) instead.
+        if isinstance(extensions, str) and len(missing) > 1:
+            _LOGGER.debug(extensions)
+            found.update(self.get_extensions_concurrent(
+                missing, flags=flags, filters=filters))
+            return found
+
+        if isinstance(extensions, str):
+            _LOGGER.error(extensions)
+            return found
+
+        for extension in extensions:
+            unique_id = f'{extension["publisher"]["publisherName"]}.' \
+                        f'{extension["extensionName"]}'
+            key = self._extension_key(unique_id, flags, filters)
+            Marketplace._extensions[key] = extension
+            found[key[0]] = extension
+
+        return found
+
+
     def get_extension(self,
                       unique_id: str,
-                      flags: List[int] = _MARKETPLACE_DEFAULT_FLAGS,
+                      flags: QueryFlags = _MARKETPLACE_DEFAULT_FLAGS,
                       filters: List[int] = None) -> Dict[str, Any]:
         """
         Get the marketplace response for a specific extension
@@ -122,29 +336,53 @@ class Marketplace():
             unique_id -- The extension id
 
         Keyword Arguments:
-            flags -- An optional list of ExtensionQueryFlags
+            flags -- An ExtensionQueryFlags bitmask (or a list of flags)
 
         Returns:
             dict or None -- A dict from the JSON response of the HTTP request
                 or None if no matching extension was found.
         """
-        criteria = [{
-            'filterType': ExtensionQueryFilterType.InstallationTarget,
-            'value': 'Microsoft.VisualStudio.Code'
-        }, {
-            'filterType': ExtensionQueryFilterType.Name,
-            'value': unique_id
-        }]
+        extensions = self.get_extensions([unique_id], flags=flags,
+                                         filters=filters)
+        return extensions.get(unique_id.lower())
 
-        # Append any additional filters that were provided.
-        for query_filter in filters or []:
-            criteria.append(query_filter)
 
-        extensions = self._extension_query(criteria=criteria, flags=flags)
+    def get_extensions_concurrent(self,
+                                  unique_ids: List[str],
+                                  max_workers: int = _MAX_QUERY_WORKERS,
+                                  **kwargs) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the marketplace responses for several extensions, using a
+        separate marketplace query for each of them. The queries are made
+        concurrently. This is for extensions that can't be combined into a
+        single query (see get_extensions).
 
-        if isinstance(extensions, list) and len(extensions) > 0:
-            return extensions[0]
-        return extensions
+        Arguments:
+            unique_ids -- The extension ids
+
+        Keyword Arguments:
+            max_workers -- The most queries to make at the same time
+            kwargs -- The keyword arguments of get_extension()
+
+        Returns:
+            dict -- The JSON response of each extension that was found, by
+                (lowercase) unique id.
+        """
+        if not unique_ids:
+            return {}
+
+        # connect up front, so the threads don't race to connect
+        if self.tunnel is not None:
+            self.tunnel.ensure_connection()
+
+        max_workers = min(max_workers, len(unique_ids))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {x.lower(): executor.submit(self.get_extension, x,
+                                                  **kwargs)
+                       for x in unique_ids}
+            found = {x: future.result() for x, future in futures.items()}
+
+        return {x: extension for x, extension in found.items() if extension}
 
 
     @staticmethod
@@ -155,72 +393,64 @@ class Marketplace():
             return ''
 
     @staticmethod
-    def _rating(result: Dict[str, Any]) -> Number:
-        return '{:0.2f}'.format(dict_from_list_key(
-            list_to_search=result['statistics'],
-            key='statisticName',
-            value='weightedRating'
-        )['value'])
+    def _statistics(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Index the statistics of a query result by name, so each statistic can
+        be looked up without scanning the list again. Where a name appears
+        more than once, the first value wins.
+        """
+        return {x.get('statisticName'): x.get('value')
+                for x in reversed(result['statistics'])}
+
+    @staticmethod
+    def _properties(result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Index the properties of a query result's (latest) version by key, so
+        each property can be looked up without scanning the list again. Where
+        a key appears more than once, the first value wins.
+        """
+        return {x.get('key'): x.get('value')
+                for x in reversed(result['versions'][0]['properties'])}
+
+    @staticmethod
+    def _rating(statistics: Dict[str, Any]) -> Number:
+        return '{:0.2f}'.format(statistics['weightedRating'])
 
     @staticmethod
-    def _rating_count(result: Dict[str, Any]) -> Number:
-        count = dict_from_list_key(
-            list_to_search=result['statistics'],
-            key='statisticName',
-            value='ratingcount'
-        )
-        return count['value'] if count else 0
+    def _rating_count(statistics: Dict[str, Any]) -> Number:
+        return statistics.get('ratingcount', 0)
 
     @staticmethod
-    def _engine(result: Dict[str, Any]) -> str:
-        return '%s' % dict_from_list_key(
-            list_to_search=result['versions'][0]['properties'],
-            key='key',
-            value='Microsoft.VisualStudio.Code.Engine'
-        )['value']
+    def _engine(properties: Dict[str, Any]) -> str:
+        return properties.get('Microsoft.VisualStudio.Code.Engine', '')
 
     @staticmethod
-    def _dependencies(result: Dict[str, Any]) -> List[Dict[str, Any]]:
-        key = dict_from_list_key(
-            list_to_search=result['versions'][0]['properties'],
-            key='key',
-            value='Microsoft.VisualStudio.Code.ExtensionDependencies'
-        )
-        return (key['value'] or 'None') if key else None
+    def _dependencies(properties: Dict[str, Any]) -> List[Dict[str, Any]]:
+        key = 'Microsoft.VisualStudio.Code.ExtensionDependencies'
+        return (properties[key] or 'None') if key in properties else None
 
     @staticmethod
-    def _extension_pack(result):
-        key = dict_from_list_key(
-            list_to_search=result['versions'][0]['properties'],
-            key='key',
-            value='Microsoft.VisualStudio.Code.ExtensionPack'
-        )
-        return (key['value'] or 'None') if key else None
+    def _extension_pack(properties):
+        key = 'Microsoft.VisualStudio.Code.ExtensionPack'
+        return (properties[key] or 'None') if key in properties else None
 
     @staticmethod
-    def _installs(result):
-        return human_number_format(float(dict_from_list_key(
-            list_to_search=result['statistics'],
-            key='statisticName',
-            value='install'
-        )['value']))
+    def _installs(statistics):
+        return _human_installs(int(statistics['install']))
 
     @staticmethod
+    @lru_cache(maxsize=1024)
     def _formatted_date(unformatted_date):
-        try:
-            date_time = datetime.strptime(unformatted_date,
-                                          '%Y-%m-%dT%H:%M:%S.%fZ')
-        except ValueError:
-            try:
-                date_time = datetime.strptime(unformatted_date,
-                                              '%Y-%m-%dT%H:%M:%S:%fZ')
-            except ValueError:
-                date_time = datetime.strptime(unformatted_date,
-                                              '%Y-%m-%dT%H:%M:%SZ')
+        # Pick the format from the character that follows the seconds,
+        # rather than trying each format until one of them parses.
+        date_format = _MARKETPLACE_DATE_FORMATS.get(
+            unformatted_date[19:20], _MARKETPLACE_DATE_FORMATS['Z'])
+        date_time = datetime.strptime(unformatted_date, date_format)
 
-        date = date_time.date()
-        date = datetime.strptime(str(date), '%Y-%m-%d')
-        return date.strftime('%-m/%d/%y')
+        # Equivalent to strftime('%-m/%d/%y'), but '%-m' isn't supported on
+        # every platform (e.g. Windows).
+        return f'{date_time.month}/{date_time.day:02d}/' \
+               f'{date_time.year % 100:02d}'
 
 
     def _format_search_results(self, search_results):
@@ -229,6 +459,9 @@ class Marketplace():
 
         Arguments:
             search_results {list} -- A list of search query results
+
+        Returns:
+            list -- A SearchResult for each of the search query results
         """
         def _unique_id(ext):
             return f'{ext["publisher"]["publisherName"]}.{ext["extensionName"]}'
@@ -236,38 +469,60 @@ class Marketplace():
         def _last_updated(ext):
             return self._formatted_date(ext['versions'][0]['lastUpdated'])
 
-        return [{
-            'EXTENSION ID': _unique_id(x),
-            'VERSION': x['versions'][0]['version'],
-            'LAST UPDATE': _last_updated(x),
-            'RATING': self._rating(x),
-            'INSTALLS': self._installs(x),
-            'DESCRIPTION': self._short_description(x),
-        } for x in search_results]
+        def _row(ext):
+            statistics = self._statistics(ext)
+            return SearchResult(
+                extension_id=_unique_id(ext),
+                version=ext['versions'][0]['version'],
+                last_update=_last_updated(ext),
+                rating=self._rating(statistics),
+                installs=self._installs(statistics),
+                description=self._short_description(ext),
+            )
 
+        return [_row(x) for x in search_results]
 
-    def get_extension_latest_version(self, unique_id: str, engine_version: str):
-        flags = [ExtensionQueryFlags.IncludeLatestVersionOnly]
-        filters = [{
-            'filterType': ExtensionQueryFilterType.InstallationTargetVersion,
-            'value': engine_version,
-        }]
 
-        response = self.get_extension(unique_id, flags=flags, filters=filters)
+    def get_extensions_latest_versions(self, unique_ids: List[str],
+                                       engine_version: str
+                                       ) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latest version of several extensions that is compatible with
+        a given engine version, using a single marketplace query.
+
+        Arguments:
+            unique_ids -- The extension ids
+            engine_version -- The version of the editor
+
+        Returns:
+            dict -- The JSON response of each extension that was found, by
+                (lowercase) unique id.
+        """
+        return self.get_extensions(unique_ids,
+                                   flags=_LATEST_VERSION_FLAGS,
+                                   filters=self._engine_filters(engine_version))
+
+
+    @staticmethod
+    def _engine_filters(engine_version: str) -> List[Dict[str, Any]]:
+        return [_criterion(ExtensionQueryFilterType.InstallationTargetVersion,
+                           engine_version)]
+
+
+    def get_extension_latest_version(self, unique_id: str, engine_version: str):
+        response = self.get_extension(
+            unique_id, flags=_LATEST_VERSION_FLAGS,
+            filters=self._engine_filters(engine_version))
 
         if not response:
             _CONSOLE.print('Your search returned 0 extensions')
             return
 
-        if isinstance(response, str):
-            _LOGGER.error(response)
-
         return response
 
 
     def show_extension_info(self, unique_id: str,
-                            flags: List[int] = [
-                                ExtensionQueryFlags.AllAttributes]):
+                            flags: int = ExtensionQueryFlags.AllAttributes):
         """
         Display information from the VSCode Marketplace about an extension.
 
@@ -284,11 +539,6 @@ class Marketplace():
             _CONSOLE.print('Your search returned 0 extensions')
             return
 
-        if isinstance(ext, str):
-            _LOGGER.error('Could not get info for extension "%s". %s',
-                          unique_id, ext)
-            return
-
         def _tags(extension):
             """
             Filter the list of extension tags, removing any that have names
@@ -300,11 +550,8 @@ class Marketplace():
             Returns:
                 str: A comma-delimited, filtered list of extension tags
             """
-            try:
-                return ', '.join(list(filter(lambda t: not t.startswith('__'),
-                                            extension['tags'])))
-            except KeyError:
-                return ''
+            return ', '.join(t for t in extension.get('tags', ())
+                             if not t.startswith('__'))
 
         name = 'Name: ' + ext['displayName']
         num_releases = 'Releases: ' + str(len(ext['versions']))
@@ -313,42 +560,46 @@ class Marketplace():
         latest_version = 'Latest Version: ' + str(ext['versions'][0]['version'])
         last_updated = 'Last Updated: ' + self._formatted_date(ext['lastUpdated'])
 
-        rating_value = str(self._rating(ext))
-        num_ratings = str(self._rating_count(ext))
+        statistics = self._statistics(ext)
+        properties = self._properties(ext)
+
+        rating_value = str(self._rating(statistics))
+        num_ratings = str(self._rating_count(statistics))
         rating = 'Rating: ' + rating_value + '(' + num_ratings + ')'
 
-        installs = 'Installs: ' + str(self._installs(ext))
-        required_engine = 'Required VSCode Engine: ' + self._engine(ext)
-        dependencies = 'Extension Dependencies: ' + self._dependencies(ext)
-        extension_pack = 'Extension Pack: ' + self._extension_pack(ext)
+        installs = 'Installs: ' + str(self._installs(statistics))
+        required_engine = 'Required VSCode Engine: ' + self._engine(properties)
+        dependencies = 'Extension Dependencies: ' + \
+            self._dependencies(properties)
+        extension_pack = 'Extension Pack: ' + self._extension_pack(properties)
         categories = 'Categories: ' + ', '.join(ext['categories'])
         tags = 'Tags: ' + _tags(ext)
         description = self._short_description(ext)
 
-        output = (
-            f'{name:30} {num_releases:30}\n'
-            f'{publisher:30} {release_date:30}\n'
-            f'{latest_version:30} {last_updated:30}\n'
-            f'{rating:30} {installs:25}\n'
-            f'\n'
-            f'{required_engine:60}\n'
-            f'{dependencies:60}\n'
-            f'{extension_pack:60}\n'
-            f'\n'
-            f'{categories:60}\n'
-            f'{tags:60}\n'
-            f'\n'
-            f'{description}'
-        )
-
-        print(dedent(output).strip() + '\n')
+        parts = [
+            f'{name:30} {num_releases:30}',
+            f'{publisher:30} {release_date:30}',
+            f'{latest_version:30} {last_updated:30}',
+            f'{rating:30} {installs:25}',
+            '',
+            f'{required_engine:60}',
+            f'{dependencies:60}',
+            f'{extension_pack:60}',
+            '',
+            f'{categories:60}',
+            f'{tags:60}',
+            '',
+            description,
+        ]
+
+        print('\n'.join(parts).rstrip() + '\n')
 
 
     def search_extensions(self,
                           search_text: str,
                           page_size: int = 15,
                           sort_by: int = ExtensionQuerySortByTypes.Relevance,
-                          flags: List[int] = _MARKETPLACE_DEFAULT_FLAGS,
+                          flags: QueryFlags = _SEARCH_FLAGS,
                           **kwargs):
         """
         Gets a list of search results from the VSCode Marketplace.
@@ -358,25 +609,18 @@ class Marketplace():
 
         Keyword Arguments:
             page_size -- The number of results to return
-            flags -- A list of ExtensionQueryFlags
+            flags -- An ExtensionQueryFlags bitmask (or a list of flags)
 
         Returns:
-            list -- A list of extension result dicts
+            list -- A list of SearchResult tuples
         """
-        criteria = [{
-            'filterType': ExtensionQueryFilterType.InstallationTarget,
-            'value': 'Microsoft.VisualStudio.Code'
-        }, {
-            'filterType': ExtensionQueryFilterType.SearchText,
-            'value': search_text
-        }]
-
-        # Add additional filters to the criteria based on arguments
-        for category in kwargs.get('categories', []):
-            criteria.append({
-                'filterType': ExtensionQueryFilterType.Category,
-                'value': category,
-            })
+        # Filter the results by the search text and any of the given categories
+        criteria = [
+            _VSCODE_CRITERION,
+            _criterion(ExtensionQueryFilterType.SearchText, search_text),
+            *(_criterion(ExtensionQueryFilterType.Category, x)
+              for x in kwargs.get('categories', ())),
+        ]
 
         extensions = self._extension_query(criteria=criteria, flags=flags,
                                            page_size=page_size, sort_by=sort_by)
@@ -1,22 +1,35 @@
 """The Tunnel provides a means of communicating with a remote host."""
 
+import atexit
+import os
+import select
+import shutil
 import sys
+import tarfile
+import threading
+from shlex import quote
 from socket import gethostname
 from getpass import getpass
-from typing import Any
+from typing import Any, Dict, List, Tuple
 
 import fabric
-from paramiko import ssh_exception
+from paramiko import Channel, ssh_exception
 import rich.console
 
 from pyvem._config import rich_theme, _PROG
-from pyvem._containers import ConnectionParts
+from pyvem._containers import AttributeDict, ConnectionParts
 from pyvem._logging import get_rich_logger
 from pyvem._util import delimit
 
 _CONSOLE = rich.console.Console(theme=rich_theme)
 _LOGGER = get_rich_logger(__name__, console=_CONSOLE)
 
+# The number of seconds between keepalive packets on an idle ssh connection.
+_KEEPALIVE_INTERVAL = 30
+
+# The number of bytes read from a command's output at a time.
+_EXEC_READ_SIZE = 32768
+
 
 class Tunnel:
     """
@@ -27,9 +40,26 @@ class Tunnel:
     system.
     """
 
+    # Open connections that are shared by all Tunnel instances in the current
+    # process, keyed by the host and gateway they connect to. The lock keeps
+    # concurrent commands (e.g. marketplace queries made from a thread pool)
+    # from each opening their own connection to the same host.
+    _pool: Dict[Tuple, fabric.Connection] = {}
+    _pool_lock = threading.Lock()
+
+    # Open gateway connections, keyed by the gateway they connect to. Each
+    # host connection through the same gateway opens its own channel on the
+    # gateway's connection, rather than handshaking with the gateway again.
+    _gateways: Dict[Tuple, fabric.Connection] = {}
+
+    # The hosts that don't have a tar command, so files are never streamed
+    # from them as an archive after the first attempt fails.
+    _hosts_without_tar = set()
+
     def __init__(self, ssh_host: ConnectionParts = None,
                  ssh_gateway: ConnectionParts = None,
-                 autoconnect: bool = False):
+                 autoconnect: bool = False,
+                 compress: bool = False):
         """
         Apply argued ssh connection arguments. Setup connection if specified.
 
@@ -37,8 +67,13 @@ class Tunnel:
             ssh_host -- the ssh_host connection info
             ssh_gateway -- the ssh_gateway connection info
             autoconnect -- If True, try to connect to the remote host
+            compress -- If True, compress the ssh connection. This helps with
+                large text output (e.g. marketplace query responses) over a
+                slow network, but it only costs cpu time for transfers of
+                files that are already compressed (e.g. extensions).
         """
         self._connection = None
+        self._compress = compress
         self._localhost_name = gethostname()
         self._ssh_host = None
         self._ssh_gateway = None
@@ -80,6 +115,17 @@ class Tunnel:
             )
 
 
+    def host_id(self) -> str:
+        """
+        Identify the remote host that commands are run on, e.g. so the output
+        of a command on one host isn't mistaken for its output on another.
+        """
+        host = self._ssh_host
+        if host is None:
+            return ''
+        return f'{host.username}@{host.hostname}:{host.port}'
+
+
     def ensure_connection(self):
         """
         Check for existing ssh connection.
@@ -102,10 +148,72 @@ class Tunnel:
             force -- If True, the tunnel will attempt to re-establish a
                 connection, ignoring whether or not a connection already exists
         """
-        if force or not self.is_connected():
-            self._connection = self.get_connection(
-                ssh_host=ssh_host or self._ssh_host,
-                ssh_gateway=ssh_gateway or self._ssh_gateway)
+        if not force and self.is_connected():
+            return
+
+        ssh_host = ssh_host or self._ssh_host
+        ssh_gateway = ssh_gateway or self._ssh_gateway
+        key = self._pool_key(ssh_host, ssh_gateway, self._compress)
+
+        with Tunnel._pool_lock:
+            # Reuse a pooled connection to the same host (if it's still alive)
+            # rather than going through another ssh handshake.
+            connection = Tunnel._pool.get(key)
+            if not force and self._is_alive(connection):
+                _LOGGER.debug('Reusing connection to host: %s.',
+                              ssh_host.hostname)
+                self._connection = connection
+                return
+
+            # Only pool the new connection once it's been opened.
+            connection = self.get_connection(ssh_host=ssh_host,
+                                             ssh_gateway=ssh_gateway)
+            Tunnel._pool[key] = connection
+            self._connection = connection
+
+
+    @staticmethod
+    def _pool_key(ssh_host: ConnectionParts,
+                  ssh_gateway: ConnectionParts = None,
+                  compress: bool = False) -> Tuple:
+        """
+        Build the key that identifies a pooled connection.
+
+        Arguments:
+            ssh_host -- the ssh_host connection info
+            ssh_gateway -- the ssh_gateway connection info
+            compress -- whether the connection is compressed
+
+        Returns:
+            tuple
+        """
+        gateway = None
+        if ssh_gateway is not None:
+            gateway = (ssh_gateway.hostname, ssh_gateway.port,
+                       ssh_gateway.username)
+        return (ssh_host.hostname, ssh_host.port, ssh_host.username, gateway,
+                compress)
+
+
+    @staticmethod
+    def _is_alive(connection: fabric.Connection) -> bool:
+        """
+        Check that a connection is open and that its transport still responds.
+
+        Arguments:
+            connection -- A fabric connection (or None)
+
+        Returns:
+            bool -- True if the connection can be used, False if not.
+        """
+        if connection is None or not connection.is_connected:
+            return False
+
+        try:
+            connection.transport.send_ignore()
+            return True
+        except (EOFError, OSError, ssh_exception.SSHException):
+            return False
 
 
     def is_connected(self) -> bool:
@@ -137,6 +245,7 @@ class Tunnel:
         password = ssh_host.password
         num_failed_attempts = 0
         max_allowed_failed_attempts = 3
+        connection = None
 
         while num_failed_attempts < max_allowed_failed_attempts:
             if not password:
@@ -161,22 +270,39 @@ class Tunnel:
             # trying to connect to the host or the gateway.
 
             try:
-                # establish the ssh connection
-                connection = fabric.Connection(
-                    host=ssh_host.hostname,
-                    port=ssh_host.port,
-                    user=ssh_host.username,
-                    gateway=fabric.Connection(
-                        host=ssh_gateway.hostname,
-                        user=ssh_gateway.username,
-                        port=ssh_gateway.port,
-                        connect_kwargs={'password': password}
-                    ) if ssh_gateway is not None else None,
-                    connect_kwargs={'password': password}
-                )
-
-                # open the ssh connection to test the connection
-                connection.open()
+                transport = self._unauthenticated_transport(connection)
+
+                if transport is not None:
+                    # The host rejected the previous password, but its
+                    # connection is still open. Retry the authentication on
+                    # it, rather than going through another handshake.
+                    transport.auth_password(ssh_host.username, password)
+                    connection.connect_kwargs['password'] = password
+                    connection.transport = transport
+
+                else:
+                    # establish the ssh connection
+                    connection = fabric.Connection(
+                        host=ssh_host.hostname,
+                        port=ssh_host.port,
+                        user=ssh_host.username,
+                        gateway=self._gateway_connection(
+                            ssh_gateway, password
+                        ) if ssh_gateway is not None else None,
+                        connect_kwargs={
+                            'password': password,
+                            'compress': self._compress,
+                        }
+                    )
+
+                    # open the ssh connection to test the connection
+                    connection.open()
+
+                # Every command and file transfer runs in its own channel of
+                # this one connection. Keep it alive while the program is
+                # busy locally (e.g. installing extensions), so later commands
+                # don't need another handshake and authentication.
+                connection.transport.set_keepalive(_KEEPALIVE_INTERVAL)
                 _LOGGER.info('Connected to host: %s.', ssh_host.hostname)
                 return connection
 
@@ -199,6 +325,60 @@ class Tunnel:
                 sys.exit(1)
 
 
+    @classmethod
+    def _gateway_connection(cls, ssh_gateway: ConnectionParts,
+                            password: str) -> fabric.Connection:
+        """
+        Get a connection to the ssh gateway, reusing an open one if there is
+        one. A new connection is only opened once a host connection that uses
+        it is opened.
+
+        Arguments:
+            ssh_gateway -- the ssh_gateway connection info
+            password -- the password to authenticate with (if the gateway
+                isn't connected yet)
+
+        Returns:
+            fabric.Connection
+        """
+        key = (ssh_gateway.hostname, ssh_gateway.port, ssh_gateway.username)
+        connection = cls._gateways.get(key)
+
+        if not cls._is_alive(connection):
+            connection = fabric.Connection(
+                host=ssh_gateway.hostname,
+                user=ssh_gateway.username,
+                port=ssh_gateway.port,
+                connect_kwargs={'password': password}
+            )
+            cls._gateways[key] = connection
+        return connection
+
+
+    @staticmethod
+    def _unauthenticated_transport(connection: fabric.Connection) -> Any:
+        """
+        Get the transport of a connection that was opened, but that failed to
+        authenticate (e.g. because of a wrong password).
+
+        Arguments:
+            connection -- A fabric connection (or None)
+
+        Returns:
+            paramiko.Transport -- The open transport, or None if there's no
+                open, unauthenticated transport (e.g. if the gateway is the
+                one that failed to authenticate).
+        """
+        if connection is None:
+            return None
+
+        transport = connection.client.get_transport()
+        if transport is None or not transport.is_active() or \
+                transport.is_authenticated():
+            return None
+        return transport
+
+
     def get(self, remote_path: str, local_dest: str) -> None:
         """
         Fetch a file from the remote path to the local path.
@@ -214,6 +394,153 @@ class Tunnel:
                       self._localhost_name, local_dest)
 
 
+    def get_files(self, remote_dir: str, file_names: List[str],
+                  local_dir: str) -> None:
+        """
+        Fetch several files from the same remote directory to a local
+        directory, streaming them all as a single tar archive over one ssh
+        channel, rather than transferring each file on its own. If the
+        archive can't be streamed, each file is fetched with get() instead.
+
+        Arguments:
+            remote_dir -- the path to the directory on the remote host.
+            file_names -- the names of the files in the remote directory.
+            local_dir -- the path to the local destination directory.
+        """
+        self.ensure_connection()
+        received = set()
+
+        if self._ssh_host.hostname not in Tunnel._hosts_without_tar:
+            received = self._stream_files(remote_dir, file_names, local_dir)
+
+        for name in file_names:
+            if name in received:
+                _LOGGER.debug('Copied "%s:%s" to "%s:%s"',
+                              self._ssh_host.hostname,
+                              os.path.join(remote_dir, name),
+                              self._localhost_name,
+                              os.path.join(local_dir, name))
+            else:
+                self.get(os.path.join(remote_dir, name),
+                         os.path.join(local_dir, name))
+
+
+    def _stream_files(self, remote_dir: str, file_names: List[str],
+                      local_dir: str) -> set:
+        """
+        Stream files from a remote directory to a local directory as a single
+        tar archive.
+
+        Arguments:
+            See get_files()
+
+        Returns:
+            set -- The names of the files that were received.
+        """
+        wanted = set(file_names)
+        received = set()
+
+        command = f'tar -C {quote(remote_dir)} -cf - ' + \
+                  ' '.join(quote(name) for name in file_names)
+
+        channel = self._open_session()
+        try:
+            channel.exec_command(command)
+
+            # Only extract the regular files that were asked for, so the
+            # archive can't write anywhere else on the local system.
+            with tarfile.open(fileobj=channel.makefile('rb'),
+                              mode='r|') as archive:
+                for member in archive:
+                    if member.isfile() and member.name in wanted:
+                        source = archive.extractfile(member)
+                        local_path = os.path.join(local_dir, member.name)
+                        with open(local_path, 'wb') as local_file:
+                            shutil.copyfileobj(source, local_file)
+                        received.add(member.name)
+
+            channel.recv_exit_status()
+
+        except (EnvironmentError, tarfile.TarError,
+                ssh_exception.SSHException) as err:
+            _LOGGER.debug('Could not stream files from "%s:%s". %r',
+                          self._ssh_host.hostname, remote_dir, err)
+
+            # The shell exits with 127 if there's no tar command. Only check
+            # once the command has exited, since an archive that failed to
+            # extract locally may still be streaming.
+            if channel.exit_status_ready() and \
+                    channel.recv_exit_status() == 127:
+                Tunnel._hosts_without_tar.add(self._ssh_host.hostname)
+
+        finally:
+            channel.close()
+
+        return received
+
+
+    def _open_session(self) -> Channel:
+        """
+        Open a new channel on the transport of the current connection. Every
+        channel is multiplexed over the same ssh connection, so opening one
+        only takes a single round trip (rather than another handshake).
+
+        Returns:
+            paramiko.Channel
+        """
+        self.ensure_connection()
+        return self._connection.transport.open_session()
+
+
+    def _exec(self, command: str) -> AttributeDict:
+        """
+        Execute a command on its own channel and collect its output, without
+        going through fabric's runner (which starts threads to echo and watch
+        the output streams of every command).
+
+        Arguments:
+            command -- The command to execute
+
+        Returns:
+            AttributeDict -- The exited status, stdout, and stderr of the
+                command. A non-zero exit status is not an error, it's left
+                up to the caller to check.
+        """
+        stdout = []
+        stderr = []
+        channel = self._open_session()
+        try:
+            channel.exec_command(command)
+
+            # Drain both streams as they arrive. Reading all of stdout before
+            # stderr would hang once the command fills the stderr window,
+            # since it stops writing to stdout until stderr is read. The
+            # channel becomes readable when either stream has output, and
+            # stays readable once the output has ended.
+            while not (channel.eof_received or channel.closed):
+                select.select([channel], [], [])
+                if channel.recv_ready():
+                    stdout.append(channel.recv(_EXEC_READ_SIZE))
+                if channel.recv_stderr_ready():
+                    stderr.append(channel.recv_stderr(_EXEC_READ_SIZE))
+
+            # Nothing arrives after the EOF, so read whatever is still buffered
+            # (e.g. output that arrived along with the EOF) until it's empty.
+            stdout.extend(iter(lambda: channel.recv(_EXEC_READ_SIZE), b''))
+            stderr.extend(
+                iter(lambda: channel.recv_stderr(_EXEC_READ_SIZE), b''))
+
+            exited = channel.recv_exit_status()
+        finally:
+            channel.close()
+
+        return AttributeDict({
+            'exited': exited,
+            'stdout': b''.join(stdout).decode('utf-8', 'replace'),
+            'stderr': b''.join(stderr).decode('utf-8', 'replace'),
+        })
+
+
     def rmdir(self, path: str, force: bool = False) -> bool:
         """
         Remove a specified file or directory on the remote system.
@@ -224,13 +551,11 @@ class Tunnel:
         Returns:
             True if the remote dir was successfully removed, False if not
         """
-        self.ensure_connection()
-
         opts = '-r'
         if force:
             opts += 'f'
 
-        res = self._connection.run(f'rm {opts} {path}')
+        res = self._exec(f'rm {opts} {quote(path)}')
 
         if res.exited == 0:
             _LOGGER.debug('Removed remote directory: "%s:%s"',
@@ -251,13 +576,27 @@ class Tunnel:
         Returns:
             True if the remove directory was able to be created, False if not
         """
-        self.ensure_connection()
-        res = self._connection.run(f'mkdir -p {path}')
+        return self.mkdir_many([path])
+
+
+    def mkdir_many(self, paths: List[str]) -> bool:
+        """
+        Create several directories on the remote system using a single remote
+        command, and add them to the running set of created directories.
+
+        Arguments:
+            paths -- the paths to the directories to create
+
+        Returns:
+            True if all the directories were able to be created, False if not
+        """
+        res = self._exec('mkdir -p -- ' + ' '.join(quote(x) for x in paths))
 
         if res.exited == 0:
-            _LOGGER.debug('Created remote directory: "%s:%s"',
-                          self._ssh_host.hostname, path)
-            self._created_dirs.add(path)
+            for path in paths:
+                _LOGGER.debug('Created remote directory: "%s:%s"',
+                              self._ssh_host.hostname, path)
+            self._created_dirs.update(paths)
             return True
 
         return False
@@ -275,12 +614,20 @@ class Tunnel:
                           'remove them.', delimit(self._created_dirs))
         else:
             # There are directories that need to be removed and the remote
-            # connection is active
-            for directory in self._created_dirs:
-                try:
-                    self.rmdir(directory)
-                except EnvironmentError as err:
-                    _LOGGER.error(err)
+            # connection is active, so remove all of them at once.
+            paths = ' '.join(quote(x) for x in self._created_dirs)
+            try:
+                res = self._exec(f'rm -rf -- {paths}')
+            except EnvironmentError as err:
+                _LOGGER.error(err)
+                return
+
+            if res.exited == 0:
+                _LOGGER.debug('Removed remote directories: "%s:%s"',
+                              self._ssh_host.hostname,
+                              delimit(self._created_dirs))
+            else:
+                _LOGGER.error(res.stderr)
 
 
     def run(self, command: str, hide: bool = True) -> Any:
@@ -290,25 +637,65 @@ class Tunnel:
         Arguments:
             command -- The command to execute
 
+        Keyword Arguments:
+            hide -- If False, echo the command's output while it runs
+
         Returns:
             The output of executing the command from the remote host
         """
         try:
+            if hide:
+                return self._exec(command)
+
             self.ensure_connection()
-            return self._connection.run(command, hide=hide)
+            return self._connection.run(command, hide=False, warn=True)
         except KeyboardInterrupt:
             _LOGGER.debug('%s interrupted. Preparing to exit.', _PROG)
             sys.exit(1)
 
 
-    def close(self) -> None:
+    def close(self, release: bool = False) -> None:
         """
-        Close the remote SSH connection.
+        Stop using the remote SSH connection. The connection itself stays open
+        (in the pool of connections) for any other tunnel to the same host,
+        until the program exits.
+
+        Keyword Arguments:
+            release -- If True, also close the connection and drop it from
+                the pool.
         """
-        if self._connection is not None:
+        if self._connection is None:
+            return
+
+        if release:
+            # Drop the connection from the pool, so no other tunnel tries to
+            # reuse it once it's closed.
+            with Tunnel._pool_lock:
+                for key, connection in list(Tunnel._pool.items()):
+                    if connection is self._connection:
+                        del Tunnel._pool[key]
+
             self._connection.close()
             _LOGGER.debug('Closed ssh tunnel connection.')
 
+        self._connection = None
+
+
+    @classmethod
+    def shutdown_pool(cls) -> None:
+        """
+        Close every pooled connection. This runs when the program exits.
+        """
+        # Close the host connections before the gateways they go through.
+        with cls._pool_lock:
+            connections = list(cls._pool.values())
+            connections.extend(cls._gateways.values())
+            cls._pool.clear()
+            cls._gateways.clear()
+
+        for connection in connections:
+            connection.close()
+
 
     def __del__(self):
         """
@@ -318,3 +705,6 @@ class Tunnel:
             self.close()
         except ImportError:
             pass
+
+
+atexit.register(Tunnel.shutdown_pool)
@@ -1,11 +1,11 @@
 """Misc utility functions"""
 
 import datetime
-import math
 import os
 import socket
-import subprocess
-from typing import List, Dict, Any
+import sys
+import time
+from typing import Any, Dict, Iterable, Iterator, List
 
 
 def props(cls):
@@ -15,7 +15,7 @@ def props(cls):
     Returns:
         Class -- A class
     """
-    return [i for i in cls.__dict__.keys() if i[:1] != '_']
+    return [i for i in cls.__dict__ if not i.startswith('_')]
 
 
 def get_public_attributes(obj: Dict[str, Any]) -> Dict[str, Any]:
@@ -26,11 +26,16 @@ def get_public_attributes(obj: Dict[str, Any]) -> Dict[str, Any]:
     Arguments:
         obj {dict} -- A dict
     """
-    attributes = {}
-    for key, value in obj.__dict__.items():
-        if not key.startswith('_'):
-            attributes[key] = value
-    return attributes
+    return {k: v for k, v in obj.__dict__.items() if not k.startswith('_')}
+
+
+def _needs_expansion(path: str) -> bool:
+    """
+    Check whether a path has anything (e.g. '~' or '$HOME') that needs to be
+    expanded, so paths that don't can skip the expansion. Windows also
+    expands '%NAME%' variables.
+    """
+    return '~' in path or '$' in path or '%' in path
 
 
 def resolved_path(path: str) -> str:
@@ -47,7 +52,9 @@ def resolved_path(path: str) -> str:
     Returns:
         str
     """
-    return os.path.realpath(os.path.expandvars(os.path.expanduser(path)))
+    if _needs_expansion(path):
+        path = os.path.expandvars(os.path.expanduser(path))
+    return os.path.realpath(path)
 
 
 def expanded_path(path: str) -> str:
@@ -62,27 +69,74 @@ def expanded_path(path: str) -> str:
         An expanded file-system path, regardless of whether or not the path
         actually exists.
     """
-    return os.path.abspath(os.path.expandvars(os.path.expanduser(path)))
+    if _needs_expansion(path):
+        path = os.path.expandvars(os.path.expanduser(path))
+    return os.path.abspath(path)
 
 
-def has_internet_connection() -> bool:
-    """Check if the system currently has a functioning internet connection"""
+# The time (from time.monotonic()) and result of the last connection probe.
+_LAST_PROBE = [float('-inf'), False]
+
+
+def has_internet_connection(ttl: float = 5.0) -> bool:
+    """
+    Check if the system currently has a functioning internet connection. The
+    result is reused for ttl seconds, rather than probing again every time.
+
+    Keyword Arguments:
+        ttl -- The number of seconds to reuse the result of a probe for
+    """
+    now = time.monotonic()
+    if now - _LAST_PROBE[0] < ttl:
+        return _LAST_PROBE[1]
+
+    # Connect to the address directly, since there's nothing to resolve.
     try:
-        host = socket.gethostbyname('1.1.1.1')
-        sock = socket.create_connection((host, 80), 2)
-        sock.close()
-        return True
+        with socket.create_connection(('1.1.1.1', 80), 2):
+            connected = True
     except OSError:
-        return False
+        connected = False
+
+    _LAST_PROBE[:] = [now, connected]
+    return connected
+
+
+def truthy_iter(iterable: Iterable[Any]) -> Iterator[Any]:
+    """Lazily skips the "falsy" elements of an iterable"""
+    return filter(None, iterable)
 
 
 def truthy_list(list_to_filter) -> List[Any]:
     """Removes "falsy" elements from a list"""
-    return list(filter(None, list_to_filter))
+    return list(truthy_iter(list_to_filter))
+
+
+def index_by(list_of_dicts: List[Dict[str, Any]],
+             key: str) -> Dict[Any, Dict[str, Any]]:
+    """
+    Index a list of dicts by the value of one of their keys, so that several
+    items can be looked up without scanning the list for each one of them.
+    Dicts without the key are left out, and the first of several dicts having
+    the same value wins (like dict_from_list_key()).
+
+    Arguments:
+        list_of_dicts -- The list to index
+        key -- The name of the key to index the dicts by
+
+    Returns:
+        dict -- The dicts, by the value of their key
+    """
+    index = {}
+    for item in list_of_dicts:
+        if key in item:
+            index.setdefault(item[key], item)
+    return index
 
 
 def dict_from_list_key(list_to_search: List[Any], key: str, value: str,
-                       default_response: Any = None) -> Dict[str, Any]:
+                       default_response: Any = None,
+                       index: Dict[Any, Dict[str, Any]] = None
+                       ) -> Dict[str, Any]:
     """
     Return the first item from a list of dicts where a specified key in the
     dict matches a specified value
@@ -94,10 +148,15 @@ def dict_from_list_key(list_to_search: List[Any], key: str, value: str,
 
     Keyword Arguments:
         default_response -- Value to return if no match is found
+        index -- The list, as indexed by index_by() for the same key. If
+            given, the value is looked up in the index instead of scanning
+            the list (e.g. when looking up several values in the same list).
 
     Returns:
         dict -- The matching dict or None if not found
     """
+    if index is not None:
+        return index.get(value, default_response)
 
     if not isinstance(list_to_search, List):
         raise AttributeError('Expected a list, got a '
@@ -112,6 +171,16 @@ def dict_from_list_key(list_to_search: List[Any], key: str, value: str,
         return default_response
 
 
+# The units of human_number_format(), from the largest to the smallest.
+_NUMBER_UNITS = (
+    ('P', 1e15),
+    ('T', 1e12),
+    ('G', 1e9),
+    ('M', 1e6),
+    ('K', 1e3),
+)
+
+
 def human_number_format(number):
     """
     Format a number into a more human-friendly format (e.g. 1000 = 1K)
@@ -122,27 +191,31 @@ def human_number_format(number):
     Returns:
         str -- The human-friendly-formatted string version of the number
     """
-    units = ['', 'K', 'M', 'G', 'T', 'P']
-    k = 1000.0
-    magnitude = int(math.floor(math.log(number, k)))
-
-    if magnitude == 0:
-        return f'{number / k**magnitude}{units[magnitude]}'
-    return f'{(number / k**magnitude):.1f}{units[magnitude]}'
+    magnitude = abs(number)
+    for unit, size in _NUMBER_UNITS:
+        if magnitude >= size:
+            return f'{number / size:.1f}{unit}'
+    return f'{number:.1f}'
 
 
 def shell_dimensions():
     """
-    Return the number of rows and columns visible in the current shell
+    Return the number of rows and columns visible in the current shell. If
+    neither stdout nor stdin is a terminal, a standard 24x80 size is assumed.
 
     Returns:
         tuple(int, int)
     """
-    with subprocess.Popen(['stty', 'size'],
-                          stdout=subprocess.PIPE,
-                          encoding='utf-8') as proc:
-        rows, columns = proc.stdout.readline().split(' ')
-        return int(rows), int(columns)
+    for stream in (sys.__stdout__, sys.__stdin__):
+        try:
+            size = os.get_terminal_size(stream.fileno())
+        except (AttributeError, ValueError, OSError):
+            continue
+
+        # A terminal that hasn't been given a size reports 0x0.
+        if size.columns:
+            return size.lines, size.columns
+    return 24, 80
 
 
 def iso_now(include_microseconds=False, format_for_path=True):
@@ -1,7 +1,7 @@
 """Commands command implementation"""
 
-import os
 import sys
+from types import MappingProxyType
 from typing import List
 
 from pyvem._command import Command
@@ -9,7 +9,6 @@ from pyvem._config import _PROG
 from pyvem._help import Help
 from pyvem._logging import get_rich_logger
 
-# pylint: disable=unused-import
 from pyvem.commands.config import config_command
 from pyvem.commands.help import help_command
 from pyvem.commands.info import info_command
@@ -61,25 +60,13 @@ class CommandsCommand(Command):
 commands_command = CommandsCommand(name='commands')
 
 
-def get_command_list():
-    """
-    Returns a list of all the filenames (without their extensions) from the
-    commands/ directory, which represents the names of all the valid commands.
-
-    Returns:
-        list
-    """
-    here = os.path.dirname(__file__)
-    cmds = [f.split('.')[0] for f in os.listdir(here) if not f.startswith('_')]
-    return sorted(cmds)
-
-
 def get_command_map():
     """
     Maps all command aliases to their command name.
 
     Returns:
-        dict -- A flattened, 1D dict of all names and aliases.
+        MappingProxyType -- A flattened, 1D (read-only) dict of all names and
+            aliases.
     """
     mapped = {}
     commands_and_keys = set()
@@ -89,11 +76,10 @@ def get_command_map():
             mapped[alias] = obj.name
             commands_and_keys.add(alias)
 
-    for cmd in _COMMAND_NAMES:
-        obj = getattr(sys.modules[__name__], f'{cmd}_command')
+    for obj in _COMMANDS:
         map_aliases(obj)
 
-    return mapped, commands_and_keys
+    return MappingProxyType(mapped), commands_and_keys
 
 
 def resolved_command(command_name: str) -> str:
@@ -116,19 +102,33 @@ def get_command_obj(command_name: str) -> Command:
     if command_name == 'commands':
         return commands_command
 
-    resolved_name = resolved_command(command_name)
-    if resolved_name:
-        return getattr(sys.modules[__name__], f'{resolved_name}_command')
+    return _COMMAND_OBJ_MAP.get(resolved_command(command_name))
 
 
 def get_command_objs(include_hidden_commands: bool = False) -> List[Command]:
     """Returns a list of all Command objects"""
-    command_objects = [get_command_obj(x) for x in get_command_list()]
+    command_objects = list(_COMMANDS)
 
     if include_hidden_commands:
         return command_objects
     return [x for x in command_objects if not x.is_hidden]
 
 
-_COMMAND_NAMES = sorted([x for x in get_command_list() if x])
+# Every command, in order of their names. The set of commands is fixed, so
+# it's listed here rather than discovered from the modules in this package.
+_COMMANDS = (
+    commands_command,
+    config_command,
+    help_command,
+    info_command,
+    install_command,
+    list_command,
+    outdated_command,
+    search_command,
+    update_command,
+    version_command,
+)
+
+_COMMAND_NAMES = tuple(sorted(x.name for x in _COMMANDS))
+_COMMAND_OBJ_MAP = MappingProxyType({x.name: x for x in _COMMANDS})
 _COMMAND_MAP, _COMMAND_NAMES_AND_ALIASES = get_command_map()
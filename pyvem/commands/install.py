@@ -9,7 +9,7 @@ from pyvem._command import Command
 from pyvem._config import _PROG
 from pyvem._help import Help
 from pyvem._util import delimit
-from pyvem._editor import SupportedEditorCommands, get_editors
+from pyvem._editor import SupportedEditorCommands, get_editors, prefetch_editors
 from pyvem._extension import get_extension
 from pyvem._logging import get_rich_logger
 
@@ -251,6 +251,9 @@ class InstallCommand(Command):
         remote_output = Command.main_options.remote_output_dir
         local_output = Command.main_options.output_dir
 
+        # check all of the requested editors for updates at once
+        prefetch_editors(*[self.system_editors[x] for x in editors_to_install])
+
         for editor in editors_to_install:
             current_editor = self.system_editors[editor]
 
@@ -276,6 +279,8 @@ class InstallCommand(Command):
         remote_output = Command.main_options.remote_output_dir
         local_output = Command.main_options.output_dir
 
+        downloaded_paths = []
+
         for req in extensions:
             ext = get_extension(req, tunnel=Command.tunnel)
 
@@ -289,15 +294,22 @@ class InstallCommand(Command):
             # receive a list having one path in it.
             extension_paths = ext.download(remote_output, local_output)
 
-            # Install the extension at each path to each of the target editors.
             for path in extension_paths:
-                for editor_name in target_editors:
-                    editor = self.system_editors[editor_name]
-                    editor.install_extension(path)
+                # two of the requested extensions may share a dependency,
+                # which only needs to be installed once.
+                if path in downloaded_paths:
+                    continue
 
                 # add the extension to the list of temporary files to remove
                 # once all processing has finished.
                 self.store_temporary_file_path(path)
+                downloaded_paths.append(path)
+
+        # Install all of the downloaded extensions to each of the target
+        # editors, using a single editor invocation per target.
+        for editor_name in target_editors:
+            editor = self.system_editors[editor_name]
+            editor.install_extensions(downloaded_paths)
 
 
     def run(self, *args, **kwargs):
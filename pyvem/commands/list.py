@@ -11,7 +11,7 @@ from rich import box
 
 from pyvem._command import Command
 from pyvem._config import _PROG, rich_theme
-from pyvem._editor import SupportedEditorCommands, get_editors
+from pyvem._editor import SupportedEditorCommands, get_editors, prefetch_editors
 from pyvem._help import Help
 from pyvem._logging import get_rich_logger
 
@@ -163,7 +163,7 @@ class ListCommand(Command):
             editor_id -- The name of a supported editor.
         """
         editor = self.system_editors[editor_id]
-        editor_name = editor['editor_id']
+        editor_name = editor.editor_id
 
         # if no extensions were specified, check for updates to all of the
         # extensions for the current editor. Otherwise, just check for updates
@@ -212,6 +212,10 @@ class ListCommand(Command):
             target_editors = self._get_target_editors(args.target)
         valid_editors = self._validate_target_editors(target_editors)
 
+        # list the extensions of all the editors concurrently
+        prefetch_editors(*[self.system_editors[x] for x in valid_editors],
+                         remote=False)
+
         for editor in valid_editors:
             self._print_extensions_for_editor(editor)
 
@@ -10,7 +10,7 @@ from rich import box
 from pyvem._command import Command
 from pyvem._config import _PROG, rich_theme
 from pyvem._help import Help
-from pyvem._editor import SupportedEditorCommands, get_editors
+from pyvem._editor import SupportedEditorCommands, get_editors, prefetch_editors
 from pyvem._logging import get_rich_logger
 
 
@@ -207,7 +207,7 @@ class OutdatedCommand(Command):
                 latest version, and last updated date.
         """
         editor = self.system_editors[editor_id]
-        editor_name = editor['editor_id']
+        editor_name = editor.editor_id
         outdated = []
 
         # if no extensions were specified, check for updates to all of the
@@ -224,18 +224,19 @@ class OutdatedCommand(Command):
                 _LOGGER.warning('%s is not installed to %s', x, editor_name)
 
         # Check each of the determined extensions for newer remote versions
-        # in the VSCode Marketplace.
+        # in the VSCode Marketplace, using a single query for all of them.
         num_extensions_to_check = len(extensions_to_check)
         _LOGGER.info('Checking %d %s extensions. This may take a minute...',
                      num_extensions_to_check, editor_name)
 
-        for index, extension in enumerate(extensions_to_check):
-            uid = extension['unique_id']
-            _LOGGER.info('(%d/%d) Checking extension: %s', index + 1, num_extensions_to_check, uid)
+        latest = Command.marketplace.get_extensions_latest_versions(
+            [x['unique_id'] for x in extensions_to_check], editor.engine)
 
+        for extension in extensions_to_check:
+            uid = extension['unique_id']
             installed_version = extension['version']
             try:
-                response = Command.marketplace.get_extension_latest_version(uid, editor.engine)
+                response = latest[uid.lower()]
 
                 last_updated = response['lastUpdated']
                 latest_version = response['versions'][0]['version']
@@ -286,6 +287,8 @@ class OutdatedCommand(Command):
             code editors that are not installed. (default: {False})
         """
         outdated = []
+        prefetch_editors(*self.system_editors.values())
+
         for editor in self.system_editors.values():
             _LOGGER.debug('%r, %r', editor, editor.latest_version)
             if editor.can_update and (show_non_installed or editor.installed):
@@ -336,6 +339,10 @@ class OutdatedCommand(Command):
         if args.editors or args.all_editors:
             self._get_outdated_editors(args.all_editors)
         else:
+            # resolve the target editors' versions and extensions up front
+            prefetch_editors(*[self.system_editors[x] for x in target_editors],
+                             remote=False)
+
             # Get the outdated extensions
             self._get_outdated_extensions_for_editors(target_editors, args.extensions)
 
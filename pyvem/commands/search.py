@@ -152,7 +152,7 @@ class SearchCommand(Command):
             table.add_column('Description', justify='left', no_wrap=False)
 
             for result in search_results:
-                table.add_row(*result.values())
+                table.add_row(*result)
             _console.print(table)
         else:
             _console.print('Your search returned 0 results.')
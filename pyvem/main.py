@@ -74,7 +74,6 @@ def create_main_parser() -> configargparse.ArgParser:
     #
     parser.add_argument('command',
                         nargs='?',
-                        choices=_COMMAND_NAMES.append(None),
                         help=f'The main {_PROG} command to execute.')
 
     parser.add_argument('args',
@@ -102,6 +101,13 @@ def create_main_parser() -> configargparse.ArgParser:
                                 help='Specify a SSH gateway in the form '
                                 '[user@]server[:port].')
 
+    optional_named.add_argument('--ssh-compress',
+                                action='store_true',
+                                default=False,
+                                help='Compress the SSH connection, which '
+                                'speeds up marketplace queries over a slow '
+                                'network.')
+
     optional_named.add_argument('-o', '--output-dir',
                                 default=_TMP_OUTPUT_DIR,
                                 type=resolved_path,
@@ -126,6 +132,12 @@ def create_main_parser() -> configargparse.ArgParser:
                           help='Do not remove temporary downloads on the '
                           'local machine.')
 
+    optional.add_argument('--no-cache',
+                          action='store_true',
+                          default=False,
+                          help='Do not reuse marketplace responses or editor '
+                          'releases cached by earlier runs.')
+
     #
     # Add verbosity argument option group
     #
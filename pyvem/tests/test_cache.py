@@ -0,0 +1,111 @@
+"""Tests functionality of the on-disk cache."""
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pyvem import _cache
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        patcher = mock.patch.object(_cache, '_CACHE_DIR', temp_dir.name)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_missing_value_is_none(self):
+        self.assertIsNone(_cache.load_cached('missing'))
+
+    def test_stored_value_is_loaded(self):
+        _cache.store_cached('key', {'name': '1.0'}, fingerprint=1)
+        self.assertEqual(_cache.load_cached('key', fingerprint=1),
+                         {'name': '1.0'})
+
+    def test_changed_fingerprint_invalidates_value(self):
+        _cache.store_cached('key', 'value', fingerprint=1)
+        self.assertIsNone(_cache.load_cached('key', fingerprint=2))
+
+    def test_expired_value_is_none(self):
+        _cache.store_cached('key', 'value')
+        self.assertIsNone(_cache.load_cached('key', ttl=-1))
+        self.assertEqual(_cache.load_cached('key', ttl=60), 'value')
+
+    def test_disk_cached_only_computes_once(self):
+        compute = mock.Mock(return_value=['a', 'b'])
+        self.assertEqual(_cache.disk_cached('key', compute), ['a', 'b'])
+        self.assertEqual(_cache.disk_cached('key', compute), ['a', 'b'])
+        self.assertEqual(compute.call_count, 1)
+
+    def test_disk_cached_refresh_recomputes(self):
+        compute = mock.Mock(return_value='value')
+        _cache.disk_cached('key', compute)
+        _cache.disk_cached('key', compute, refresh=True)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_none_is_not_cached(self):
+        compute = mock.Mock(return_value=None)
+        _cache.disk_cached('key', compute)
+        _cache.disk_cached('key', compute)
+        self.assertEqual(compute.call_count, 2)
+
+    def test_cached_run_reuses_successful_output(self):
+        tunnel = mock.Mock(**{'host_id.return_value': 'user@a:22'})
+        tunnel.run.return_value = mock.Mock(exited=0, stdout='{}')
+        _cache.cached_run(tunnel, 'curl https://example.com')
+        result = _cache.cached_run(tunnel, 'curl https://example.com')
+        self.assertEqual((result.exited, result.stdout), (0, '{}'))
+        self.assertEqual(tunnel.run.call_count, 1)
+
+    def test_cached_run_does_not_cache_failures(self):
+        tunnel = mock.Mock(**{'host_id.return_value': 'user@a:22'})
+        tunnel.run.return_value = mock.Mock(exited=1, stdout='')
+        _cache.cached_run(tunnel, 'curl https://example.com')
+        _cache.cached_run(tunnel, 'curl https://example.com')
+        self.assertEqual(tunnel.run.call_count, 2)
+
+    def test_cached_run_refresh_runs_again(self):
+        tunnel = mock.Mock(**{'host_id.return_value': 'user@a:22'})
+        tunnel.run.return_value = mock.Mock(exited=0, stdout='{}')
+        _cache.cached_run(tunnel, 'curl https://example.com')
+        tunnel.run.return_value = mock.Mock(exited=0, stdout='[]')
+        result = _cache.cached_run(tunnel, 'curl https://example.com',
+                                   refresh=True)
+        self.assertEqual(result.stdout, '[]')
+        self.assertEqual(tunnel.run.call_count, 2)
+
+        # the refreshed output replaces the cached one
+        result = _cache.cached_run(tunnel, 'curl https://example.com')
+        self.assertEqual(result.stdout, '[]')
+        self.assertEqual(tunnel.run.call_count, 2)
+
+    def test_cached_run_does_not_cache_invalid_output(self):
+        tunnel = mock.Mock(**{'host_id.return_value': 'user@a:22'})
+        tunnel.run.return_value = mock.Mock(exited=0, stdout='<html>')
+        validate = mock.Mock(return_value=False)
+        _cache.cached_run(tunnel, 'curl https://example.com', validate=validate)
+        _cache.cached_run(tunnel, 'curl https://example.com', validate=validate)
+        validate.assert_called_with('<html>')
+        self.assertEqual(tunnel.run.call_count, 2)
+
+    def test_cached_run_output_is_not_shared_between_hosts(self):
+        first = mock.Mock(**{'host_id.return_value': 'user@a:22'})
+        second = mock.Mock(**{'host_id.return_value': 'user@b:22'})
+        for tunnel in (first, second, first, second):
+            tunnel.run.return_value = mock.Mock(exited=0, stdout='{}')
+            _cache.cached_run(tunnel, 'curl https://example.com')
+        self.assertEqual(first.run.call_count, 1)
+        self.assertEqual(second.run.call_count, 1)
+
+
+def test_suite():
+    return unittest.findTestCases(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    unittest.main(defaultTest='test_suite')
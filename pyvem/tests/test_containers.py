@@ -0,0 +1,49 @@
+"""Tests functionality of the containers module."""
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sys
+import unittest
+
+from pyvem._config import _DEFAULT_SSH_PORT, _DEFAULT_SSH_USER
+from pyvem._containers import ConnectionParts, parsed_connection_parts
+
+
+class TestParsedConnectionParts(unittest.TestCase):
+    def test_hostname_only_uses_defaults(self):
+        parts = parsed_connection_parts('example.com')
+        self.assertEqual(parts.hostname, 'example.com')
+        self.assertEqual(parts.username, _DEFAULT_SSH_USER)
+        self.assertEqual(parts.port, _DEFAULT_SSH_PORT)
+        self.assertIsNone(parts.password)
+
+    def test_all_components_are_parsed(self):
+        parts = parsed_connection_parts('user:secret@example.com:2222')
+        self.assertEqual(parts, ConnectionParts(hostname='example.com',
+                                                username='user',
+                                                password='secret',
+                                                port=2222))
+
+    def test_password_may_contain_at_sign(self):
+        parts = parsed_connection_parts('user:p@ss@example.com')
+        self.assertEqual(parts.username, 'user')
+        self.assertEqual(parts.password, 'p@ss')
+        self.assertEqual(parts.hostname, 'example.com')
+
+    def test_invalid_connection_strings_are_not_parsed(self):
+        for connection_string in ['', 'user@', 'example.com:ssh', ':22']:
+            self.assertIsNone(parsed_connection_parts(connection_string))
+
+    def test_parsed_parts_are_not_shared_between_calls(self):
+        first = parsed_connection_parts('example.com')
+        first.password = 'secret'
+        self.assertIsNone(parsed_connection_parts('example.com').password)
+
+
+def test_suite():
+    return unittest.findTestCases(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,82 @@
+"""Tests caching the latest editor releases (offline)."""
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pyvem import _cache
+from pyvem._editor import SupportedEditor, get_editors, prefetch_latest
+
+_RATE_LIMITED = json.dumps({'message': 'API rate limit exceeded'})
+_CODIUM_RELEASE = json.dumps({
+    'tag_name': '1.50.0',
+    'name': '1.50.0',
+    'assets': [{'name': 'VSCodium-1.50.0.AppImage',
+                'browser_download_url': 'https://example.com/codium'}],
+})
+
+
+class TestLatestRelease(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        for patcher in (mock.patch.object(_cache, '_CACHE_DIR', temp_dir.name),
+                        mock.patch.object(SupportedEditor, 'refresh_cache',
+                                          False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tunnel = mock.Mock()
+        self.tunnel.run.return_value = mock.Mock(exited=0, stdout='')
+
+    def _codium(self, stdout):
+        self.tunnel.run.return_value.stdout = stdout
+        return get_editors(self.tunnel).codium
+
+    def test_release_is_cached(self):
+        self.assertEqual(self._codium(_CODIUM_RELEASE).latest['name'],
+                         '1.50.0')
+        self.assertEqual(self._codium(_RATE_LIMITED).latest_version, '1.50.0')
+        self.assertEqual(self.tunnel.run.call_count, 1)
+
+    def test_api_error_is_not_cached(self):
+        editor = self._codium(_RATE_LIMITED)
+        self.assertIsNone(editor.latest)
+        self.assertIsNone(editor.latest_version)
+        self.assertIsNone(editor.download_url)
+
+        editor = self._codium(_CODIUM_RELEASE)
+        self.assertEqual(editor.latest['tag_name'], '1.50.0')
+        self.assertEqual(self.tunnel.run.call_count, 2)
+
+    def test_prefetched_api_error_is_not_cached(self):
+        self.tunnel.run.return_value.stdout = _RATE_LIMITED
+        editor = get_editors(self.tunnel).codium
+        prefetch_latest(editor)
+        self.assertIsNone(editor.latest)
+
+        self.assertEqual(self._codium(_CODIUM_RELEASE).latest['name'],
+                         '1.50.0')
+        self.assertEqual(self.tunnel.run.call_count, 2)
+
+    def test_refresh_ignores_cached_release(self):
+        self.assertIsNotNone(self._codium(_CODIUM_RELEASE).latest)
+        SupportedEditor.refresh_cache = True
+
+        editor = self._codium(_CODIUM_RELEASE.replace('1.50.0', '1.51.0'))
+        prefetch_latest(editor)
+        self.assertEqual(editor.latest_version, '1.51.0')
+        self.assertEqual(self.tunnel.run.call_count, 2)
+
+
+def test_suite():
+    return unittest.findTestCases(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,153 @@
+"""Tests planning and batching extension downloads (offline)."""
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import sys
+import unittest
+from unittest import mock
+
+from pyvem._extension import Extension, _downloaded_paths
+
+
+def _extension(unique_id, version='1.0.0', **kwargs):
+    return Extension(unique_id=unique_id,
+                     version=version,
+                     download_url=f'https://example.com/{unique_id}',
+                     **kwargs)
+
+
+def _ids(extensions):
+    return [x.unique_id for x in extensions]
+
+
+class TestCollectUnique(unittest.TestCase):
+    def test_extension_without_children_is_collected_alone(self):
+        ext = _extension('a.one')
+        self.assertEqual(ext.collect_unique(set()), [ext])
+
+    def test_children_come_before_the_extension(self):
+        dep = _extension('a.dep')
+        pack = _extension('a.pack')
+        ext = _extension('a.main', extension_dependencies=[dep],
+                         extension_pack=[pack])
+        self.assertEqual(_ids(ext.collect_unique(set())),
+                         ['a.dep', 'a.pack', 'a.main'])
+
+    def test_nested_children_are_collected_depth_first(self):
+        leaf = _extension('a.leaf')
+        dep = _extension('a.dep', extension_dependencies=[leaf])
+        ext = _extension('a.main', extension_dependencies=[dep])
+        self.assertEqual(_ids(ext.collect_unique(set())),
+                         ['a.leaf', 'a.dep', 'a.main'])
+
+    def test_shared_child_is_collected_once(self):
+        shared = _extension('a.shared')
+        first = _extension('a.first', extension_dependencies=[shared])
+        second = _extension('a.second', extension_dependencies=[shared])
+        pack = _extension('a.pack', extension_pack=[first, second])
+        self.assertEqual(_ids(pack.collect_unique(set())),
+                         ['a.shared', 'a.first', 'a.second', 'a.pack'])
+
+    def test_seen_extensions_are_skipped_and_recorded(self):
+        dep = _extension('a.dep')
+        ext = _extension('a.main', extension_dependencies=[dep])
+        seen = {'a.dep'}
+        self.assertEqual(_ids(ext.collect_unique(seen)), ['a.main'])
+        self.assertEqual(seen, {'a.dep', 'a.main'})
+        self.assertEqual(ext.collect_unique(seen), [])
+
+    def test_self_reference_does_not_recurse(self):
+        ext = _extension('a.self')
+        ext.extension_pack = [ext]
+        self.assertEqual(ext.collect_unique(set()), [ext])
+
+    def test_dependency_cycle_is_collected_once(self):
+        first = _extension('a.first')
+        second = _extension('a.second', extension_dependencies=[first])
+        first.extension_dependencies = [second]
+        self.assertEqual(_ids(first.collect_unique(set())),
+                         ['a.second', 'a.first'])
+
+
+class TestPlanDownloads(unittest.TestCase):
+    def test_plan_lists_urls_and_file_names_in_order(self):
+        dep = _extension('a.dep', version='2.1.0')
+        ext = _extension('a.main', version=None,
+                         extension_dependencies=[dep])
+        self.assertEqual(ext.plan_downloads(), [
+            ('https://example.com/a.dep', 'a.dep-2.1.0.vsix'),
+            ('https://example.com/a.main', 'a.main.vsix'),
+        ])
+
+    def test_plan_contains_each_extension_once(self):
+        shared = _extension('a.shared')
+        first = _extension('a.first', extension_dependencies=[shared])
+        pack = _extension('a.pack', extension_pack=[first, shared])
+        pack.extension_dependencies = [pack]
+        self.assertEqual([name for _, name in pack.plan_downloads()], [
+            'a.shared-1.0.0.vsix',
+            'a.first-1.0.0.vsix',
+            'a.pack-1.0.0.vsix',
+        ])
+
+    def test_plan_is_fresh_on_every_call(self):
+        ext = _extension('a.main', extension_pack=[_extension('a.pack')])
+        self.assertEqual(ext.plan_downloads(), ext.plan_downloads())
+        self.assertEqual(len(ext.plan_downloads()), 2)
+
+
+class TestDownload(unittest.TestCase):
+    def setUp(self):
+        self.tunnel = mock.Mock()
+        self.dep = _extension('a.dep', tunnel=self.tunnel)
+        self.ext = _extension('a.main', tunnel=self.tunnel,
+                              extension_dependencies=[self.dep])
+
+    def _run_batch(self, stdout):
+        # the batched download, then any single retries
+        self.tunnel.run.side_effect = [
+            mock.Mock(exited=0, stdout=stdout, stderr=''),
+            mock.Mock(exited=22, stdout='', stderr='404'),
+        ]
+        return self.ext.download('/remote', '/local')
+
+    def test_status_lines_are_parsed(self):
+        self.assertEqual(_downloaded_paths(
+            '200 /remote/a.vsix\n404 /remote/b.vsix\n000 /remote/c.vsix\n'
+            '200 /remote/with space.vsix\n'),
+            {'/remote/a.vsix', '/remote/with space.vsix'})
+
+    def test_downloads_fail_on_http_errors(self):
+        self._run_batch('200 /remote/a.dep-1.0.0.vsix\n'
+                        '200 /remote/a.main-1.0.0.vsix\n')
+        self.assertIn(' -f ', self.tunnel.run.call_args_list[0][0][0])
+
+    def test_successful_batch_is_not_retried(self):
+        paths = self._run_batch('200 /remote/a.dep-1.0.0.vsix\n'
+                                '200 /remote/a.main-1.0.0.vsix\n')
+        self.assertEqual(self.tunnel.run.call_count, 1)
+        self.assertEqual(paths, ['/local/a.dep-1.0.0.vsix',
+                                 '/local/a.main-1.0.0.vsix'])
+
+    def test_failed_download_is_retried_even_if_curl_exits_0(self):
+        paths = self._run_batch('404 /remote/a.dep-1.0.0.vsix\n'
+                                '200 /remote/a.main-1.0.0.vsix\n')
+        self.assertEqual(self.tunnel.run.call_count, 2)
+        self.assertIn('/remote/a.dep-1.0.0.vsix',
+                      self.tunnel.run.call_args[0][0])
+        self.assertEqual(paths, ['/local/a.main-1.0.0.vsix'])
+        self.tunnel.get_files.assert_called_once_with(
+            '/remote', ['a.main-1.0.0.vsix'], '/local')
+
+    def test_failed_extension_is_not_transferred(self):
+        self.assertFalse(self._run_batch('200 /remote/a.dep-1.0.0.vsix\n'))
+        self.tunnel.get_files.assert_not_called()
+
+
+def test_suite():
+    return unittest.findTestCases(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,138 @@
+"""Tests the batched extension queries of the marketplace module (offline)."""
+
+# pylint: disable=missing-class-docstring
+# pylint: disable=missing-function-docstring
+
+import json
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+from pyvem import _cache, _marketplace
+from pyvem._marketplace import Marketplace
+
+
+def _extension(publisher, name, version='1.0.0'):
+    return {
+        'publisher': {'publisherName': publisher},
+        'extensionName': name,
+        'versions': [{'version': version}],
+    }
+
+
+def _query_response(*extensions):
+    return json.dumps({'results': [{'extensions': list(extensions)}]})
+
+
+class FakeTunnel:
+    """Answers every command with the same canned marketplace response"""
+
+    def __init__(self, stdout):
+        self.run = mock.Mock(return_value=mock.Mock(exited=0, stdout=stdout,
+                                                    stderr=''))
+
+    @staticmethod
+    def host_id():
+        return 'user@example.com:22'
+
+
+class TestGetExtensions(unittest.TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        for patcher in (mock.patch.object(_cache, '_CACHE_DIR', temp_dir.name),
+                        mock.patch.dict(Marketplace._extensions, clear=True),
+                        mock.patch.object(Marketplace, 'refresh_cache', False)):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+        self.tunnel = FakeTunnel(_query_response(
+            _extension('ms-python', 'python', '2.0.0'),
+            _extension('esbenp', 'prettier-vscode', '3.0.0'),
+        ))
+        self.marketplace = Marketplace(tunnel=self.tunnel)
+
+    def test_batch_is_fetched_with_one_query(self):
+        found = self.marketplace.get_extensions(['ms-python.python',
+                                                 'esbenp.prettier-vscode'])
+        self.assertEqual(sorted(found), ['esbenp.prettier-vscode',
+                                         'ms-python.python'])
+        self.assertEqual(found['ms-python.python']['versions'][0]['version'],
+                         '2.0.0')
+        self.assertEqual(self.tunnel.run.call_count, 1)
+
+    def test_batch_is_split_into_entries_per_extension(self):
+        self.marketplace.get_extensions(['ms-python.python',
+                                         'esbenp.prettier-vscode'])
+        self.assertEqual(
+            sorted(key[0] for key in Marketplace._extensions),
+            ['esbenp.prettier-vscode', 'ms-python.python'])
+
+    def test_second_lookup_does_not_query_again(self):
+        self.marketplace.get_extensions(['ms-python.python',
+                                         'esbenp.prettier-vscode'])
+
+        # other instances (e.g. created while resolving dependencies) share
+        # the extensions that were already found.
+        other = Marketplace(tunnel=self.tunnel)
+        extension = other.get_extension('MS-Python.Python')
+        self.assertEqual(extension['extensionName'], 'python')
+        self.assertIn('esbenp.prettier-vscode',
+                      other.get_extensions(['esbenp.prettier-vscode']))
+        self.assertEqual(self.tunnel.run.call_count, 1)
+
+    def test_only_missing_extensions_are_queried(self):
+        self.tunnel.run.return_value.stdout = _query_response(
+            _extension('ms-python', 'python'))
+        self.marketplace.get_extensions(['ms-python.python'])
+        self.tunnel.run.reset_mock()
+        self.tunnel.run.return_value.stdout = _query_response(
+            _extension('esbenp', 'prettier-vscode'))
+
+        self.marketplace.get_extensions(['ms-python.python',
+                                         'esbenp.prettier-vscode'])
+        self.assertEqual(self.tunnel.run.call_count, 1)
+        command = self.tunnel.run.call_args[0][0]
+        self.assertIn('esbenp.prettier-vscode', command)
+        self.assertNotIn('ms-python.python', command)
+
+    def test_different_flags_are_queried_separately(self):
+        self.marketplace.get_extensions(['ms-python.python'])
+        self.marketplace.get_extensions(['ms-python.python'], flags=0)
+        self.assertEqual(self.tunnel.run.call_count, 2)
+
+    def test_error_response_is_not_cached(self):
+        self.tunnel.run.return_value.stdout = json.dumps(
+            {'message': 'Too many requests'})
+        self.assertEqual(self.marketplace.get_extensions(['a.b']), {})
+
+        Marketplace._extensions.clear()
+        self.tunnel.run.return_value.stdout = _query_response(
+            _extension('a', 'b'))
+        self.assertIn('a.b', self.marketplace.get_extensions(['a.b']))
+        self.assertEqual(self.tunnel.run.call_count, 2)
+
+    def test_response_without_results_finds_nothing(self):
+        for stdout in ('{}', '{"results": []}'):
+            for decoder in (_marketplace._QUERY_RESPONSE_DECODER, None):
+                with mock.patch.object(_marketplace,
+                                       '_QUERY_RESPONSE_DECODER', decoder):
+                    self.tunnel.run.return_value.stdout = stdout
+                    self.assertEqual(
+                        self.marketplace.get_extensions(['a.b']), {})
+
+    def test_response_is_parsed_without_msgspec(self):
+        with mock.patch.object(_marketplace, '_QUERY_RESPONSE_DECODER', None):
+            found = self.marketplace.get_extensions(['ms-python.python',
+                                                     'esbenp.prettier-vscode'])
+        self.assertEqual(len(found), 2)
+        self.assertEqual(self.tunnel.run.call_count, 1)
+
+
+def test_suite():
+    return unittest.findTestCases(sys.modules[__name__])
+
+
+if __name__ == "__main__":
+    unittest.main(defaultTest='test_suite')
@@ -11,7 +11,7 @@ setup(
     packages=find_packages(),
     entry_points={
         'console_scripts': [
-            'vem = pyvem.main:main'
+            'vem = pyvem.__main__:main'
         ]
     },
     install_requires=[
@@ -26,5 +26,8 @@ setup(
         'rich',
         'semantic_version',
     ],
+    extras_require={
+        'speedups': ['orjson', 'msgspec'],
+    },
     python_requires='>=3.6'
 )